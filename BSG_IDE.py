@@ -10,7 +10,6 @@ import os,re
 import sys
 import tempfile
 import subprocess
-import pyspellchecker
 #------------------------------------------------------------------------------------------------------
 import venv
 import platform
@@ -139,8 +138,8 @@ def install_base_packages(pip_path):
             continue
 
 
-def get_requirements_path():
-    """Get path to requirements.txt with exhaustive search"""
+def requirements_candidates():
+    """Places requirements.txt may live, most specific first"""
     possible_paths = [
         # Current directory
         Path.cwd() / 'requirements.txt',
@@ -162,6 +161,18 @@ def get_requirements_path():
             Path.home() / 'Library' / 'Application Support' / 'BSG-IDE' / 'requirements.txt',
             Path('/Applications/BSG-IDE.app/Contents/Resources/requirements.txt')
         ])
+    return possible_paths
+
+def find_requirements_file():
+    """First existing requirements.txt, or None (no output, nothing created)"""
+    for path in requirements_candidates():
+        if path.is_file():
+            return path
+    return None
+
+def get_requirements_path():
+    """Get path to requirements.txt with exhaustive search"""
+    possible_paths = requirements_candidates()
 
     print("\nSearching for requirements.txt in:")
     for path in possible_paths:
@@ -379,6 +390,16 @@ def install_bsg_ide(fix_mode=False):
         required_files = {
             'BSG_IDE.py': ['base', 'python_site'],
             'BeamerSlideGenerator.py': ['base', 'python_site'],
+            'BSG_environment.py': ['base', 'python_site'],
+            'BSG_build.py': ['base', 'python_site'],
+            'BSG_compiler.py': ['base', 'python_site'],
+            'BSG_fetch.py': ['base', 'python_site'],
+            'BSG_lazy.py': ['base', 'python_site'],
+            'BSG_media_cache.py': ['base', 'python_site'],
+            'BSG_parser.py': ['base', 'python_site'],
+            'BSG_spellcheck.py': ['base', 'python_site'],
+            'BSG_thumbnails.py': ['base', 'python_site'],
+            'BSG_trace.py': ['base', 'python_site'],
             'requirements.txt': ['base'],
             'airis4d_logo.png': ['base/resources', 'resources', 'share', 'icons'],
             'bsg-ide.png': ['base/resources', 'resources', 'share', 'icons']
@@ -1028,10 +1049,24 @@ def install_remaining_packages(pip_path):
 
 
 #------------------------------------------------------------------------------------------
-
-check_and_install_dependencies()
-
-
+# Startup dependency check. A stamp keyed on requirements.txt and the interpreter
+# skips all pip and network work; the full installer only runs on --fix/--install
+# or when the GUI packages themselves are missing. Other missing packages are
+# repaired in the background once the IDE window is up.
+from BSG_environment import check_environment, missing_base_modules, repair_due
+from BSG_environment import repair as repair_environment
+
+missing_requirements = []
+if {'--fix', '--install'} & set(sys.argv[1:]):
+    check_and_install_dependencies()
+else:
+    missing_requirements = check_environment(find_requirements_file(), force='--verify' in sys.argv[1:])
+    if missing_base_modules(missing_requirements):
+        check_and_install_dependencies()
+        missing_requirements = check_environment(find_requirements_file(), force=True)
+
+
+import io
 import atexit
 import shutil
 import threading
@@ -1041,6 +1076,7 @@ import json
 import time
 import zipfile
 import tkinter as tk
+import tkinter.font
 from tkinter import ttk, filedialog, messagebox, simpledialog
 import customtkinter as ctk
 from typing import Optional, Dict, List, Tuple,Any
@@ -1048,6 +1084,10 @@ from pathlib import Path
 from PIL import Image
 import traceback
 import webbrowser
+from BSG_compiler import CompileWorker, build_notes_mode, clean_build_dir, modify_preamble_for_notes_mode
+from BSG_spellcheck import SpellCheckEngine
+from BSG_lazy import is_available, lazy_import
+from BSG_parser import DeckParser, Slide, write_deck
 #from BSE import BeamerSlideEditor,BeamerSyntaxHighlighter
 
 #-------------------------------------BSE-----------------------------------------------
@@ -1079,6 +1119,10 @@ class SimpleRedirector:
 class BeamerSyntaxHighlighter:
     """Syntax highlighting for Beamer/LaTeX content"""
 
+    # Delay after the last keystroke before highlighting, and lines per idle slice of a full pass
+    DEBOUNCE_MS = 150
+    FULL_PASS_CHUNK = 200
+
     def __init__(self, text_widget: ctk.CTkTextbox):
         self.ctk_text = text_widget
         self.text = text_widget._textbox
@@ -1109,20 +1153,27 @@ class BeamerSyntaxHighlighter:
                               foreground=self.colors['comment'],
                               font=self.italic_font)
 
-        # Define syntax patterns
+        # Inline token patterns, tried in this order at each position.
+        # Bullets and comments are whole-line checks in highlight_lines().
         self.patterns = [
-            (r'\\[a-zA-Z]+', 'command'),
             (r'\\(file|play|None)\s', 'media'),
-            (r'^-\s.*$', 'bullet'),
-            (r'https?://\S+', 'url'),
-            (r'\{.*?\}', 'bracket'),
-            (r'%.*$', 'comment'),
             (r'\\textcolor\{.*?\}', 'textcolor'),
-            (r'\[RGB\]\{[^\}]*\}', 'rgb')
+            (r'\\[a-zA-Z]+', 'command'),
+            (r'https?://\S+', 'url'),
+            (r'\[RGB\]\{[^\}]*\}', 'rgb'),
+            (r'\{.*?\}', 'bracket')
         ]
+        self._compiled_for = None
+        self._token_regex = None
+        self._group_tags = {}
+
+        # Lines waiting for the debounced pass, and progress of a full-buffer pass
+        self._dirty_lines = set()
+        self._pending_after = None
+        self._full_pass_line = None
 
         # Bind events to the CTkTextbox
-        self.ctk_text.bind('<KeyRelease>', self.highlight)
+        self.ctk_text.bind('<KeyRelease>', self.on_key_release)
         self.ctk_text.bind('<Control-v>', lambda e: self.after_paste())
         # Initialize presentation metadata
         self.presentation_info = {
@@ -1134,6 +1185,21 @@ class BeamerSyntaxHighlighter:
             'date': '\\today'
         }
 
+    def add_patterns(self, patterns: list, colors: dict) -> None:
+        """Register extra token patterns; they take precedence over the built-in ones"""
+        self.patterns[:0] = patterns
+        self.colors.update(colors)
+        for tag, color in colors.items():
+            self.text.tag_configure(tag, foreground=color, font=self.normal_font)
+
+    def token_regex(self):
+        """Combined regex with one named group per pattern, rebuilt if patterns change"""
+        if self._compiled_for != self.patterns:
+            self._group_tags = {f"t{i}": tag for i, (_, tag) in enumerate(self.patterns)}
+            self._token_regex = re.compile('|'.join(
+                f"(?P<t{i}>{pattern})" for i, (pattern, _) in enumerate(self.patterns)))
+            self._compiled_for = list(self.patterns)
+        return self._token_regex
 
     def toggle(self) -> None:
         """Toggle syntax highlighting on/off"""
@@ -1148,27 +1214,96 @@ class BeamerSyntaxHighlighter:
         for tag in self.colors.keys():
             self.text.tag_remove(tag, "1.0", "end")
 
+    def on_key_release(self, event=None) -> None:
+        """Mark the edited line and its neighbours dirty and debounce the update"""
+        if not self.active:
+            return
+        line = int(self.text.index("insert").split('.')[0])
+        self._dirty_lines.update((line - 1, line, line + 1))
+        self.schedule()
+
+    def schedule(self) -> None:
+        """(Re)start the debounce timer"""
+        if self._pending_after is not None:
+            self.text.after_cancel(self._pending_after)
+        self._pending_after = self.text.after(self.DEBOUNCE_MS, self.flush)
+
+    def visible_lines(self) -> tuple:
+        """First and last line numbers currently shown in the widget"""
+        first = int(self.text.index("@0,0").split('.')[0])
+        last = int(self.text.index(f"@0,{self.text.winfo_height()}").split('.')[0])
+        return first, last
+
+    def flush(self) -> None:
+        """Highlight the dirty lines and the visible viewport"""
+        self._pending_after = None
+        if not self.active:
+            self._dirty_lines.clear()
+            return
+
+        first, last = self.visible_lines()
+        self.highlight_lines(first, last)
+        line_count = int(self.text.index("end-1c").split('.')[0])
+        for line in sorted(self._dirty_lines):
+            if 1 <= line <= line_count and not first <= line <= last:
+                self.highlight_lines(line, line)
+        self._dirty_lines.clear()
+
     def highlight(self, event=None) -> None:
-        """Apply syntax highlighting to the text"""
+        """
+        Re-highlight the whole buffer: the viewport right away, the remaining
+        lines in idle-time slices so large buffers never block the editor.
+        """
         if not self.active:
             return
 
-        self.clear_highlighting()
-        for pattern, tag in self.patterns:
-            self.highlight_pattern(pattern, tag)
+        if self._pending_after is not None:
+            self.text.after_cancel(self._pending_after)
+        self.flush()
+        if self._full_pass_line is None:
+            self._full_pass_line = 1
+            self.text.after_idle(self._continue_full_pass)
+        else:
+            self._full_pass_line = 1
 
-    def highlight_pattern(self, pattern: str, tag: str) -> None:
-        """Apply highlighting for a specific pattern"""
-        content = self.text.get("1.0", "end-1c")
-        lines = content.split('\n')
+    def _continue_full_pass(self) -> None:
+        if not self.active or self._full_pass_line is None:
+            self._full_pass_line = None
+            return
 
-        for line_num, line in enumerate(lines, start=1):
-            for match in re.finditer(pattern, line):
-                start = match.start()
-                end = match.end()
-                start_index = f"{line_num}.{start}"
-                end_index = f"{line_num}.{end}"
-                self.text.tag_add(tag, start_index, end_index)
+        line_count = int(self.text.index("end-1c").split('.')[0])
+        first = self._full_pass_line
+        last = min(first + self.FULL_PASS_CHUNK - 1, line_count)
+        self.highlight_lines(first, last)
+
+        if last >= line_count:
+            self._full_pass_line = None
+        else:
+            self._full_pass_line = last + 1
+            self.text.after_idle(self._continue_full_pass)
+
+    def highlight_lines(self, first: int, last: int) -> None:
+        """Re-apply all tags to lines first..last with a single text read"""
+        start_index, end_index = f"{first}.0", f"{last}.end"
+        for tag in self.colors.keys():
+            self.text.tag_remove(tag, start_index, end_index)
+
+        regex = self.token_regex()
+        group_tags = self._group_tags
+        lines = self.text.get(start_index, end_index).split('\n')
+
+        for line_num, line in enumerate(lines, start=first):
+            if line.startswith('-') and line[1:2].isspace():
+                self.text.tag_add('bullet', f"{line_num}.0", f"{line_num}.end")
+
+            comment = line.find('%')
+            code_end = len(line) if comment == -1 else comment
+            if comment != -1:
+                self.text.tag_add('comment', f"{line_num}.{comment}", f"{line_num}.end")
+
+            for match in regex.finditer(line, 0, code_end):
+                self.text.tag_add(group_tags[match.lastgroup],
+                                  f"{line_num}.{match.start()}", f"{line_num}.{match.end()}")
 
     def after_paste(self) -> None:
         """Handle highlighting after paste operation"""
@@ -1178,7 +1313,152 @@ class BeamerSyntaxHighlighter:
             self.ctk_text.master.check_spelling()
 
 
+class SlideListView(ctk.CTkFrame):
+    """
+    Virtualized slide navigator. The textbox only holds the rows in view;
+    scrolling re-renders that window and changing the current slide
+    rewrites just the old and new rows. row_text(index) supplies a row's
+    label without the current-slide arrow.
+    """
+
+    def __init__(self, parent, row_text, width=180, height=400, **kwargs):
+        super().__init__(parent, fg_color="transparent", **kwargs)
+        self.row_text = row_text
+        self.count = 0
+        self.top = 0
+        self.current = -1
+        self.visible_rows = 20
+
+        self.textbox = ctk.CTkTextbox(self, width=width, height=height,
+                                      wrap='none', activate_scrollbars=False)
+        self.textbox.grid(row=0, column=0, sticky="nsew")
+        self.textbox.tag_config('selected', background='#2F3542')
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        try:
+            font = tk.font.Font(font=self.textbox._textbox.cget('font'))
+            self.line_height = max(1, font.metrics('linespace'))
+        except Exception:
+            self.line_height = 18
+
+        self.textbox.bind('<Configure>', self.on_resize)
+        self.textbox.bind('<MouseWheel>', self.on_mousewheel)
+        self.textbox.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        self.textbox.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+
+    def row_label(self, index: int) -> str:
+        prefix = "→ " if index == self.current else "  "
+        return prefix + self.row_text(index)
+
+    def set_count(self, count: int, current: int = -1) -> None:
+        """Slides were added, removed or reordered: re-render the window"""
+        self.count = count
+        self.current = current
+        self.top = min(self.top, max(0, count - self.visible_rows))
+        if not self.scroll_to(current):
+            self.render()
+
+    def render(self) -> None:
+        """Fill the textbox with the rows currently in view"""
+        last = min(self.count, self.top + self.visible_rows)
+        rows = [self.row_label(i) for i in range(self.top, last)]
+        self.textbox.delete('1.0', 'end')
+        if rows:
+            self.textbox.insert('1.0', '\n'.join(rows))
+        if self.top <= self.current < last:
+            line = self.current - self.top + 1
+            self.textbox.tag_add('selected', f"{line}.0", f"{line}.end")
+        self.update_scrollbar()
+
+    def refresh_row(self, index: int) -> None:
+        """Redraw one row if it is in view"""
+        if not self.top <= index < min(self.count, self.top + self.visible_rows):
+            return
+        line = index - self.top + 1
+        self.textbox.delete(f"{line}.0", f"{line}.end")
+        self.textbox.insert(f"{line}.0", self.row_label(index))
+        if index == self.current:
+            self.textbox.tag_add('selected', f"{line}.0", f"{line}.end")
+
+    def select(self, index: int) -> None:
+        """Move the arrow and highlight to index, touching only two rows"""
+        previous, self.current = self.current, index
+        if self.scroll_to(index):
+            return
+        self.textbox.tag_remove('selected', '1.0', 'end')
+        if previous != index:
+            self.refresh_row(previous)
+        self.refresh_row(index)
+
+    def scroll_to(self, index: int) -> bool:
+        """Scroll so index is in view. Returns True if the window was re-rendered"""
+        if index < 0 or index >= self.count:
+            return False
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + self.visible_rows:
+            self.top = index - self.visible_rows + 1
+        else:
+            return False
+        self.render()
+        return True
+
+    def index_at(self, x: int, y: int) -> int:
+        """Slide index under widget coordinates, or -1"""
+        line = int(self.textbox.index(f"@{x},{y}").split('.')[0])
+        index = self.top + line - 1
+        return index if 0 <= index < self.count else -1
+
+    def yview(self, *args) -> None:
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            top = int(float(args[1]) * self.count)
+        elif args[0] == 'scroll':
+            amount = float(args[1])
+            steps = int(amount) or (1 if amount > 0 else -1 if amount < 0 else 0)
+            step = self.visible_rows if args[2] == 'pages' else 1
+            top = self.top + steps * step
+        else:
+            return
+        top = max(0, min(top, self.count - self.visible_rows))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    def update_scrollbar(self) -> None:
+        if self.count <= self.visible_rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / self.count,
+                               min(1.0, (self.top + self.visible_rows) / self.count))
+
+    def on_mousewheel(self, event):
+        self.yview('scroll', -3 if event.delta > 0 else 3, 'units')
+        return "break"
+
+    def on_resize(self, event) -> None:
+        rows = max(1, event.height // self.line_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.top = min(self.top, max(0, self.count - rows))
+            self.render()
+
+
 class BeamerSlideEditor(ctk.CTk):
+    # Interval for draining background compiler output into the terminal
+    COMPILE_POLL_MS = 50
+    # Pause after typing before spell checking, and result polling interval
+    SPELLING_DEBOUNCE_MS = 400
+    SPELLING_POLL_MS = 50
+    # Delay before the background dependency repair starts, and its polling interval
+    ENVIRONMENT_REPAIR_DELAY_MS = 3000
+    ENVIRONMENT_POLL_MS = 500
+
     def __init__(self):
         super().__init__()
         AIRIS4D_ASCII_LOGO = """
@@ -1306,18 +1586,13 @@ class BeamerSlideEditor(ctk.CTk):
             print("Falling back to current directory")
 
 
-        # Initialize UI components
-        self.create_widgets()
+        # The UI was built above; only the terminal needs the session's directory
+        self.terminal.set_working_directory(os.getcwd())
 
         # Add recent files menu if available
         if self.session_data['recent_files']:
             self.create_recent_files_menu()
 
-        #--------------------------------------------------
-        # Set the terminal I/O in BeamerSlideGenerator
-        from BeamerSlideGenerator import set_terminal_io
-        set_terminal_io(self.terminal_io)
-
         # Configure window
         self.title("BeamerSlide Generator IDE")
         self.geometry("1200x800")
@@ -1362,6 +1637,7 @@ class BeamerSlideEditor(ctk.CTk):
         # Initialize variables
         self.current_file = None
         self.slides = []
+        self.source_bytes = b''  # Last saved/loaded file, for incremental saves
         self.current_slide_index = -1
 
         # Setup keyboard shortcuts
@@ -1389,6 +1665,10 @@ class BeamerSlideEditor(ctk.CTk):
         if self.session_data['last_file'] and os.path.exists(self.session_data['last_file']):
             self.after(100, lambda: self.load_file(self.session_data['last_file']))
 
+        # Install missing optional packages once the window is up
+        if missing_requirements and repair_due():
+            self.after(self.ENVIRONMENT_REPAIR_DELAY_MS, self.repair_missing_packages)
+
         # Bind window events
         self.bind('<Configure>', self.on_window_configure)
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -1401,13 +1681,57 @@ class BeamerSlideEditor(ctk.CTk):
         # Add binding to close context menu
         self.bind("<Button-1>", self.hide_spelling_menu)
 
+    def repair_missing_packages(self):
+        """Install missing optional packages on a background thread"""
+        specs = missing_requirements[:]
+        self.environment_repair = {}
+        self.write(f"Installing missing packages in the background: "
+                   f"{', '.join(spec for spec, _ in specs)}\n", "yellow")
+
+        def run():
+            try:
+                self.environment_repair['result'] = repair_environment(specs)
+            except Exception as e:
+                self.environment_repair['result'] = ([], [spec for spec, _ in specs])
+                self.environment_repair['error'] = str(e)
+
+        threading.Thread(target=run, name="bsg-environment-repair", daemon=True).start()
+        self.after(self.ENVIRONMENT_POLL_MS, self.poll_environment_repair)
+
+    def poll_environment_repair(self):
+        if 'result' not in self.environment_repair:
+            self.after(self.ENVIRONMENT_POLL_MS, self.poll_environment_repair)
+            return
+
+        installed, failed = self.environment_repair['result']
+        if installed:
+            self.write(f"✓ Installed: {', '.join(installed)}\n", "green")
+        if failed:
+            self.write(f"! Could not install: {', '.join(failed)}. "
+                       f"Run 'bsg-ide --fix' to repair the installation\n", "yellow")
+        # Re-stamp the environment if nothing is missing any more
+        missing_requirements[:] = check_environment(find_requirements_file(), force=True)
+
     def setup_spellchecking(self):
         """Initialize spell checking components"""
         try:
-            from spellchecker import SpellChecker
-            self.spell_checker = SpellChecker()
+            if not is_available('spellchecker'):
+                raise ImportError("spellchecker")
+
+            def load_spell_checker():
+                from spellchecker import SpellChecker
+                return SpellChecker()
+
+            # The dictionary is loaded on the spell-check thread, not during startup
+            self.spell_engine = SpellCheckEngine(loader=load_spell_checker)
+            self.spell_engine.start()
             self.spell_checking_enabled = True
 
+            # Lines edited since the last check, per editor; None means all
+            self.spelling_dirty = {}
+            self.spelling_after = None
+            self.spelling_polling = False
+
             # Configure misspelled word appearance
             for widget in [self.content_editor._textbox, self.notes_editor._textbox]:
                 widget.tag_configure("misspelled", underline=True, underlinefg="red")
@@ -1415,6 +1739,7 @@ class BeamerSlideEditor(ctk.CTk):
 
                 # Bind right-click event
                 widget.bind("<Button-3>", self.show_spelling_suggestions)
+                widget.bind("<KeyRelease>", self.on_spelling_key, add="+")
 
             print("✓ Spell checking enabled")
         except ImportError:
@@ -1427,64 +1752,70 @@ class BeamerSlideEditor(ctk.CTk):
         self.spelling_menu.add_separator()
 
     def check_spelling(self, event=None):
-        """Check spelling in real-time"""
+        """Re-check both editors completely (in the background)"""
         if not self.spell_checking_enabled:
             return
 
-        # Get the widget that triggered the event
-        widget = event.widget if event else self.content_editor._textbox
-
-        # Skip spell checking in special contexts
-        skip_tags = ['comment', 'command', 'media', 'bullet', 'url',
-                    'bracket', 'rgb', 'textcolor']
-
-        # Process both editors
         for editor in [self.content_editor._textbox, self.notes_editor._textbox]:
-            # Remove previous markings
-            editor.tag_remove("misspelled", "1.0", "end")
-
-            # Get all text
-            content = editor.get("1.0", "end")
-
-            # Find all words longer than 3 characters
-            words = re.findall(r'\b\w{4,}\b', content)
-
-            # Get positions of all words
-            word_positions = []
-            for word in words:
-                start_index = "1.0"
-                while True:
-                    start_index = editor.search(rf"\y{word}\y", start_index,
-                                              stopindex="end", regexp=True)
-                    if not start_index:
-                        break
-                    end_index = f"{start_index}+{len(word)}c"
-                    word_positions.append((word, start_index, end_index))
-                    start_index = end_index
-
-            # Check each word
-            for word, start, end in word_positions:
-                # Skip words in special syntax
-                skip = False
-                for tag in skip_tags:
-                    if editor.tag_names(start):
-                        for t in editor.tag_names(start):
-                            if t in skip_tags:
-                                skip = True
-                                break
-                    if skip:
-                        break
+            self.spelling_dirty[editor] = None
+        self.schedule_spelling(0)
+
+    def on_spelling_key(self, event) -> None:
+        """Mark the edited line and its neighbours for re-checking"""
+        if not self.spell_checking_enabled:
+            return
 
-                if skip:
+        editor = event.widget
+        dirty = self.spelling_dirty.setdefault(editor, set())
+        if dirty is not None:
+            line = int(editor.index("insert").split('.')[0])
+            dirty.update((line - 1, line, line + 1))
+        self.schedule_spelling(self.SPELLING_DEBOUNCE_MS)
+
+    def schedule_spelling(self, delay: int) -> None:
+        if self.spelling_after is not None:
+            self.after_cancel(self.spelling_after)
+        self.spelling_after = self.after(delay, self.flush_spelling)
+
+    def flush_spelling(self) -> None:
+        """Snapshot the dirty lines and hand them to the background checker"""
+        self.spelling_after = None
+        for editor, dirty in self.spelling_dirty.items():
+            if dirty is None:
+                text_lines = editor.get("1.0", "end-1c").split('\n')
+                lines = list(enumerate(text_lines, start=1))
+            else:
+                line_count = int(editor.index("end-1c").split('.')[0])
+                lines = [(n, editor.get(f"{n}.0", f"{n}.end"))
+                         for n in sorted(dirty) if 1 <= n <= line_count]
+            if lines:
+                self.spell_engine.submit(editor, lines)
+        self.spelling_dirty.clear()
+
+        if not self.spelling_polling:
+            self.spelling_polling = True
+            self.after(self.SPELLING_POLL_MS, self.poll_spelling)
+
+    def poll_spelling(self) -> None:
+        """Apply finished spell check results on the UI thread"""
+        for editor, misspelled in self.spell_engine.results():
+            for line_no, (text, spans) in misspelled.items():
+                # Skip lines edited since the snapshot; they are already queued again
+                if editor.get(f"{line_no}.0", f"{line_no}.end") != text:
                     continue
+                editor.tag_remove("misspelled", f"{line_no}.0", f"{line_no}.end")
+                for start, end in spans:
+                    editor.tag_add("misspelled", f"{line_no}.{start}", f"{line_no}.{end}")
 
-                # Check spelling
-                if word.lower() not in self.spell_checker:
-                    editor.tag_add("misspelled", start, end)
+        if self.spell_engine.busy():
+            self.after(self.SPELLING_POLL_MS, self.poll_spelling)
+        else:
+            self.spelling_polling = False
 
     def show_spelling_suggestions(self, event):
         """Show spelling suggestions on right-click"""
-        if not self.spell_checking_enabled:
+        # The dictionary loads on the spell check thread; offer nothing until it is ready
+        if not self.spell_checking_enabled or not self.spell_engine.loaded:
             return
 
         widget = event.widget
@@ -1499,7 +1830,7 @@ class BeamerSlideEditor(ctk.CTk):
             return
 
         # Check if the word is misspelled
-        if word.lower() in self.spell_checker:
+        if self.spell_engine.is_known(word):
             return
 
         # Highlight the word temporarily
@@ -1507,10 +1838,10 @@ class BeamerSlideEditor(ctk.CTk):
 
         # Get spelling suggestions
         try:
-            suggestions = list(self.spell_checker.candidates(word))[:5]
+            suggestions = list(self.spell_engine.spell_checker.candidates(word))[:5]
             if not suggestions:
                 # Fall back to correction method
-                correction = self.spell_checker.correction(word)
+                correction = self.spell_engine.spell_checker.correction(word)
                 if correction:
                     suggestions = [correction]
         except Exception:
@@ -1557,7 +1888,7 @@ class BeamerSlideEditor(ctk.CTk):
     def add_to_dictionary(self):
         """Add current word to custom dictionary"""
         if hasattr(self, 'current_word') and self.current_word:
-            self.spell_checker.word_frequency.add(self.current_word)
+            self.spell_engine.add_word(self.current_word)
             # Remove misspelled tag
             self.current_widget.tag_remove("misspelled", self.current_word_start, self.current_word_end)
             # Remove highlight
@@ -1646,6 +1977,7 @@ class BeamerSlideEditor(ctk.CTk):
             # Initialize variables
             self.current_file = None
             self.slides = []
+            self.source_bytes = b''
             self.current_slide_index = -1
 
             # Setup keyboard shortcuts
@@ -1726,65 +2058,6 @@ class BeamerSlideEditor(ctk.CTk):
             # Always close window
             self.destroy()
 
-    def load_file(self, filename):
-        """Load presentation from file with enhanced notes support"""
-        try:
-            with open(filename, 'r') as f:
-                content = f.read()
-
-            # Parse content
-            self.current_file = filename
-            self.slides = []
-            self.current_slide_index = -1
-
-            # Extract presentation info
-            import re
-            for key in self.presentation_info:
-                pattern = f"\\\\{key}{{(.*?)}}"
-                match = re.search(pattern, content)
-                if match:
-                    self.presentation_info[key] = match.group(1)
-
-            # Extract slides with notes using enhanced pattern
-            slide_pattern = r"\\title\s+(.*?)\n\\begin{Content}(.*?)\\end{Content}(?:\s*\\begin{Notes}(.*?)\\end{Notes})?"
-            slide_matches = re.finditer(slide_pattern, content, re.DOTALL)
-
-            for match in slide_matches:
-                title = match.group(1).strip()
-                content_block = match.group(2).strip()
-                notes_block = match.group(3).strip() if match.group(3) else ""
-
-                # Extract media directive if present
-                media = ""
-                content_lines = []
-                first_line = content_block.split('\n')[0].strip()
-                if first_line.startswith('\\'):
-                    media = first_line
-                    content_lines = content_block.split('\n')[1:]
-                else:
-                    content_lines = content_block.split('\n')
-
-                # Process notes
-                notes_lines = []
-                if notes_block:
-                    notes_lines = [line.strip() for line in notes_block.split('\n') if line.strip()]
-
-                self.slides.append({
-                    'title': title,
-                    'media': media,
-                    'content': [line for line in content_lines if line.strip()],
-                    'notes': notes_lines
-                })
-
-            if self.slides:
-                self.current_slide_index = 0
-                self.load_slide(0)
-
-            self.update_slide_list()
-
-        except Exception as e:
-            messagebox.showerror("Error", f"Error loading file: {str(e)}")
-
 #--------------------------------------------------------------------------------
     def ide_callback(self, action, data):
         """Enhanced IDE callback handler with proper \\None handling"""
@@ -1795,7 +2068,6 @@ class BeamerSlideEditor(ctk.CTk):
 
             # Ensure proper highlight in slide list
             self.current_slide_index = data.get('index', 0)
-            self.update_slide_list()
             self.highlight_current_slide()
 
             # Important: Reset media when changing slides
@@ -1847,8 +2119,6 @@ class BeamerSlideEditor(ctk.CTk):
                         self.content_editor.insert('end', f"{line}\n")
 
             # Update slide list display
-            self.update_slide_list()
-            self.slide_list.see(f"{self.current_slide_index + 1}.0")
             self.highlight_current_slide()
 
         elif action == "navigate_to_slide":
@@ -1861,17 +2131,25 @@ class BeamerSlideEditor(ctk.CTk):
 
                 self.current_slide_index = index
                 self.load_slide(index)
-                self.update_slide_list()
-
-                if data.get('focus'):
-                    self.slide_list.see(f"{index + 1}.0")
-                    self.highlight_current_slide()
+                self.highlight_current_slide()
 
         elif action == "error":
             # Show error in terminal
             if hasattr(self, 'terminal'):
                 self.terminal.write(f"Error: {data.get('message', 'Unknown error')}\n", "red")
 
+        elif action == "message":
+            # Converter progress output
+            if hasattr(self, 'terminal'):
+                self.terminal.write(data.get('text', ''), data.get('color', 'white'))
+
+        elif action == "missing_media":
+            # Missing media falls back to \None; say which slide lost it
+            if hasattr(self, 'terminal'):
+                self.terminal.write(
+                    f"Media not found for '{data.get('title') or 'untitled'}': "
+                    f"{data.get('media')} (using \\None)\n", "yellow")
+
     def load_slide(self, index):
         """Enhanced load_slide with proper notes handling and cleanup"""
         if 0 <= index < len(self.slides):
@@ -1884,25 +2162,25 @@ class BeamerSlideEditor(ctk.CTk):
             self.notes_editor.delete('1.0', 'end')  # Always clear notes
 
             # Update title
-            self.title_entry.insert(0, slide.get('title', ''))
+            self.title_entry.insert(0, slide.title)
 
             # Update media with explicit \None handling
-            media = slide.get('media', '')
+            media = slide.media
             if not media or media == "\\None":
                 self.media_entry.insert(0, "\\None")
             else:
                 self.media_entry.insert(0, media)
 
             # Update content
-            for item in slide.get('content', []):
+            for item in slide.content:
                 if item and item.strip():
                     #if not item.startswith('-'):
                      #   item = f"- {item}"
                     self.content_editor.insert('end', f"{item}\n")
 
             # Update notes - only if present and non-empty
-            if 'notes' in slide and slide['notes']:
-                notes = [note for note in slide['notes'] if note.strip()]
+            if slide.notes:
+                notes = [note for note in slide.notes if note.strip()]
                 if notes:  # Only add notes if there are actual non-empty notes
                     for note in notes:
                         self.notes_editor.insert('end', f"{note}\n")
@@ -1916,28 +2194,21 @@ class BeamerSlideEditor(ctk.CTk):
                 self.syntax_highlighter.highlight()
 
     def update_slide_list(self):
-        """Update slide list with improved current slide handling"""
-        self.slide_list.delete('1.0', 'end')
-        for i, slide in enumerate(self.slides):
-            prefix = "→ " if i == self.current_slide_index else "  "
-            title = slide.get('title', 'Untitled')
-            media_type = " [None]" if not slide.get('media') or slide.get('media') == "\\None" else ""
-            self.slide_list.insert('end', f"{prefix}Slide {i+1}: {title}{media_type}\n")
+        """Re-render the slide list after slides were added, removed or reordered"""
+        self.slide_list.set_count(len(self.slides), self.current_slide_index)
 
-        self.highlight_current_slide()
+    def slide_list_row(self, index: int) -> str:
+        """Label of one slide in the slide list"""
+        if index >= len(self.slides):
+            return ""
+        slide = self.slides[index]
+        title = slide.title or 'Untitled'
+        media_type = " [None]" if not slide.media or slide.media == "\\None" else ""
+        return f"Slide {index+1}: {title}{media_type}"
 
     def highlight_current_slide(self):
-        """Highlight current slide in list"""
-        # Remove previous highlight
-        self.slide_list.tag_remove('selected', '1.0', 'end')
-
-        # Add highlight to current slide
-        if self.current_slide_index >= 0:
-            start = f"{self.current_slide_index + 1}.0"
-            self.slide_list.see(start)  # Ensure visible
-            end = f"{self.current_slide_index + 1}.end"
-            self.slide_list.tag_add('selected', start, end)
-            self.slide_list.tag_config('selected', background='#2F3542')
+        """Move the slide list arrow and highlight to the current slide"""
+        self.slide_list.select(self.current_slide_index)
 #--------------------------------------------------------------------------------------------------------------------
     def setup_output_redirection(self):
         """Set up output redirection to terminal"""
@@ -2012,17 +2283,9 @@ class BeamerSlideEditor(ctk.CTk):
             if self.current_slide_index < len(self.slides) - 1:
                 self.current_slide_index += 1
 
-        # Load the new slide
+        # Load the new slide; only the old and new list rows are redrawn
         self.load_slide(self.current_slide_index)
-        self.update_slide_list()
-
-        # Ensure the current slide is visible in the list
-        line_number = self.current_slide_index + 1
-        self.slide_list.see(f"{line_number}.0")
-
-        # Update visual highlighting
         self.highlight_current_slide()
-
         return "break"  # Prevent default handling
     #----------------------------------------------------------------
     def write_to_terminal(self, text: str, color: str = "white") -> None:
@@ -2085,6 +2348,12 @@ class BeamerSlideEditor(ctk.CTk):
 
     def stop_compilation(self) -> None:
         """Stop current compilation process"""
+        worker = getattr(self, 'compile_worker', None)
+        if worker and worker.is_running():
+            worker.cancel()
+            self.write("\n[Compilation process terminated by user]\n")
+            return
+
         if self.current_process:
             try:
                 self.current_process.terminate()
@@ -2523,21 +2792,21 @@ Created by {self.__author__}
                     font=("Arial", 14, "bold")).grid(row=0, column=0, padx=5, pady=5)
 
         # Slide list with scroll
-        self.slide_list = ctk.CTkTextbox(self.sidebar, width=180, height=400)
+        self.slide_list = SlideListView(self.sidebar, self.slide_list_row, width=180, height=400)
         self.slide_list.grid(row=1, column=0, padx=5, pady=5, sticky="nsew")
 
         # Enhanced bindings for navigation
-        self.slide_list.bind('<Button-1>', self.on_slide_select)
-        self.slide_list.bind('<Up>', self.navigate_slides)
-        self.slide_list.bind('<Down>', self.navigate_slides)
-        self.slide_list.bind('<Left>', self.navigate_slides)
-        self.slide_list.bind('<Right>', self.navigate_slides)
+        self.slide_list.textbox.bind('<Button-1>', self.on_slide_select)
+        self.slide_list.textbox.bind('<Up>', self.navigate_slides)
+        self.slide_list.textbox.bind('<Down>', self.navigate_slides)
+        self.slide_list.textbox.bind('<Left>', self.navigate_slides)
+        self.slide_list.textbox.bind('<Right>', self.navigate_slides)
         self.bind('<Control-Up>', lambda e: self.move_slide(-1))
         self.bind('<Control-Down>', lambda e: self.move_slide(1))
 
         # Focus binding to enable keyboard navigation
-        self.slide_list.bind('<FocusIn>', self.on_list_focus)
-        self.slide_list.bind('<FocusOut>', self.on_list_unfocus)
+        self.slide_list.textbox.bind('<FocusIn>', self.on_list_focus)
+        self.slide_list.textbox.bind('<FocusOut>', self.on_list_unfocus)
 
         # Slide control buttons with enhanced tooltips
         button_data = [
@@ -2559,12 +2828,7 @@ Created by {self.__author__}
         # Save current slide first
         self.save_current_slide()
 
-        new_slide = {
-            'title': 'New Slide',
-            'media': '',
-            'content': [],
-            'notes': []
-        }
+        new_slide = Slide('New Slide')
 
         # If there are no slides or current_slide_index is invalid
         if not self.slides or self.current_slide_index < 0:
@@ -2592,6 +2856,7 @@ Created by {self.__author__}
         self.bind('<Control-d>', lambda e: self.duplicate_slide())    # Ctrl+D for duplicate
         self.bind('<Control-Delete>', lambda e: self.delete_slide())          # Delete for remove slide
         self.bind('<Control-s>', lambda e: self.save_file())          # Ctrl+S for save
+        self.bind('<Control-p>', lambda e: self.preview_current_slide())  # Ctrl+P for slide preview
 
 
 
@@ -2600,12 +2865,12 @@ Created by {self.__author__}
         """Handle slide list focus"""
         self.highlight_current_slide()
         # Visual feedback that list is focused
-        self.slide_list.configure(border_color="#4ECDC4")
+        self.slide_list.textbox.configure(border_color="#4ECDC4")
 
     def on_list_unfocus(self, event) -> None:
         """Handle slide list losing focus"""
         # Remove focus visual feedback
-        self.slide_list.configure(border_color="")
+        self.slide_list.textbox.configure(border_color="")
 
 
 
@@ -2615,13 +2880,9 @@ Created by {self.__author__}
                 # Save the current slide first to ensure we have the latest changes
                 self.save_current_slide()
 
-                # Create a deep copy of the current slide
+                # Copy the current slide (notes are not duplicated)
                 current_slide = self.slides[self.current_slide_index]
-                new_slide = {
-                    'title': f"{current_slide['title']} (Copy)",
-                    'media': current_slide['media'],
-                    'content': current_slide['content'].copy()  # Create a new list with the same content
-                }
+                new_slide = current_slide.copy(title=f"{current_slide.title} (Copy)", notes=())
 
                 # Insert the new slide after the current slide
                 insert_position = self.current_slide_index + 1
@@ -2754,6 +3015,27 @@ Created by {self.__author__}
                 'hover_color': hover_color
             }
 
+        # Build every mode at once; not a mode itself, so kept out of notes_buttons
+        all_modes_btn = ctk.CTkButton(
+            notes_buttons,
+            text="All Modes",
+            command=self.compile_all_modes,
+            width=100
+        )
+        all_modes_btn.pack(side="left", padx=2)
+        self.create_tooltip(all_modes_btn, "Build slides, notes and slides+notes PDFs in parallel")
+
+        clean_btn = ctk.CTkButton(
+            notes_buttons,
+            text="Clean Build",
+            command=self.clean_build,
+            width=100,
+            fg_color="gray",
+            hover_color="#4A4A4A"
+        )
+        clean_btn.pack(side="left", padx=2)
+        self.create_tooltip(clean_btn, "Remove cached build files so the next compile starts from scratch")
+
         # Editor options row (new)
         editor_options = ctk.CTkFrame(notes_frame)
         editor_options.pack(fill="x", padx=5, pady=(10, 5))
@@ -3801,6 +4083,7 @@ Created by {self.__author__}
             ("Save", self.save_file, "Save current presentation"),
             ("Convert to TeX", self.convert_to_tex, "Convert to LaTeX format"),
             ("Generate PDF", self.generate_pdf, "Generate PDF file"),
+            ("Preview Slide", self.preview_current_slide, "Compile and show only the current slide (Ctrl+P)"),
             ("Present with Notes", self.present_with_notes, "Launch dual-screen presentation with notes"),
             ("Preview PDF", self.preview_pdf, "View generated PDF"),
             ("Export to Overleaf", self.create_overleaf_zip, "Create Overleaf-compatible zip")
@@ -4006,7 +4289,7 @@ Created by {self.__author__}
                 self.write_to_terminal("TEX file not found. Generating from source...\n")
                 try:
                     from BeamerSlideGenerator import process_input_file
-                    process_input_file(self.current_file, tex_file)
+                    process_input_file(self.current_file, tex_file, ide_callback=self.ide_callback)
                     self.write_to_terminal("✓ TEX file generated successfully\n", "green")
                 except Exception as e:
                     self.write_to_terminal(f"✗ Error generating TEX file: {str(e)}\n", "red")
@@ -4203,7 +4486,7 @@ Created by {self.__author__}
             if not os.path.exists(tex_file):
                 self.write_to_terminal("Generating TeX file...\n")
                 from BeamerSlideGenerator import process_input_file
-                process_input_file(self.current_file, tex_file)
+                process_input_file(self.current_file, tex_file, ide_callback=self.ide_callback)
                 self.write_to_terminal("✓ TeX file generated successfully\n", "green")
 
             # Read TEX content and identify required files
@@ -4456,6 +4739,7 @@ Created by {self.__author__}
         """Create new presentation"""
         self.current_file = None
         self.slides = []
+        self.source_bytes = b''
         self.current_slide_index = -1
         self.update_slide_list()
         self.clear_editor()
@@ -4510,43 +4794,10 @@ Created by {self.__author__}
         self.save_current_slide()
 
         try:
-            # Get custom preamble with logo
-            content = self.get_custom_preamble()
-
-            # Add slides in BeamerSlideGenerator's expected format
-            for slide in self.slides:
-                content += "\n\n"  # Add two extra line break before new slide
-                content += f"\\title {slide['title']}\n"
-                content += "\\begin{Content}"
-                if slide['media']:
-                    content += f" {slide['media']}"
-                content += "\n"
-
-                # Format content items
-                for item in slide['content']:
-                    if item.strip():
-                        # Ensure proper bullet point format
-                       # if not item.startswith('-'):
-                        #    item = f"- {item}"
-                        content += f"{item}\n"
-
-                content += "\\end{Content}\n\n"
-                # Add notes if present
-                if 'notes' in slide and slide['notes']:
-                    content += "\\begin{Notes}\n"
-                    for note in slide['notes']:
-                        content += f"{note}\n"
-                    content += "\\end{Notes}\n"
-                else:
-                    content += "\\begin{Notes}\n"
-                    content += "\n"
-                    content += "\\end{Notes}\n"
-
-            content += "\\end{document}"
-
-            # Save to text file
-            with open(self.current_file, 'w') as f:
-                f.write(content)
+            # Unchanged slides are copied from the previous file's bytes and
+            # the result replaces the file atomically
+            self.source_bytes = write_deck(
+                self.current_file, self.get_custom_preamble(), self.slides, self.source_bytes)
 
             self.write("✓ File saved successfully: " + self.current_file + "\n", "green")
 
@@ -4609,6 +4860,12 @@ Created by {self.__author__}
 
     def get_custom_preamble(self) -> str:
             """Generate custom preamble with proper logo handling"""
+            # Reuse the last preamble while its inputs are unchanged
+            cache_key = (getattr(self, 'custom_preamble', None),
+                         tuple(sorted(self.presentation_info.items())))
+            cached = getattr(self, '_preamble_cache', None)
+            if cached and cached[0] == cache_key:
+                return cached[1]
             try:
                 # If we have a stored custom preamble, use it as base
                 if hasattr(self, 'custom_preamble'):
@@ -4645,6 +4902,7 @@ Created by {self.__author__}
                 else:
                     preamble = base_preamble
 
+                self._preamble_cache = (cache_key, preamble)
                 return preamble
 
             except Exception as e:
@@ -4673,8 +4931,12 @@ Created by {self.__author__}
 #------------------------------------------------------------------------------
 
 
-    def generate_pdf(self) -> None:
-        """Generate PDF with improved terminal handling and progress feedback"""
+    def generate_pdf(self, on_success=None) -> None:
+        """
+        Generate PDF with improved terminal handling and progress feedback.
+        The pdflatex passes run in a background worker; on_success is called
+        on the UI thread once the PDF exists instead of asking to view it.
+        """
         if not self.current_file:
             messagebox.showwarning("Warning", "Please save your file first!")
             return
@@ -4694,51 +4956,43 @@ Created by {self.__author__}
             self.write("Step 1: Converting text to TeX...\n", "white")
             self.convert_to_tex()  # This will handle notes mode correctly
 
-            # Step 2: First pdflatex pass
-            self.write("\nStep 2: First pdflatex pass...\n", "white")
-            success = self.run_pdflatex(tex_file)
-
-            if success:
-                # Step 3: Second pdflatex pass for references
-                self.write("\nStep 3: Second pdflatex pass...\n", "white")
-                success = self.run_pdflatex(tex_file)
-
-                if success:
-                    pdf_file = base_filename + '.pdf'
-                    if os.path.exists(pdf_file):
-                        # Calculate file size
-                        size = os.path.getsize(pdf_file)
-                        size_str = self.format_file_size(size)
-
-                        self.write("\n✓ PDF generated successfully!\n", "green")
-                        self.write(f"PDF Size: {size_str}\n", "green")
-
-                        # Check for any warnings in the log file
-                        log_file = base_filename + '.log'
-                        if os.path.exists(log_file):
-                            self.check_latex_log(log_file)
-
-                        # Ask if user wants to view the PDF
-                        if messagebox.askyesno("Success",
-                                             f"PDF generated successfully!\nSize: {size_str}\n\nWould you like to view it now?"):
-                            self.preview_pdf()
-                    else:
-                        self.write("\n✗ Error: PDF file not found after compilation\n", "red")
-                else:
-                    self.write("\n✗ Error in second pdflatex pass\n", "red")
-            else:
-                self.write("\n✗ Error in first pdflatex pass\n", "red")
+            def job(worker):
+                # Step 2: pdflatex passes until cross-references are stable
+                worker.emit("\nStep 2: Running pdflatex...\n", "white")
+                if not worker.run_until_stable(tex_file):
+                    worker.emit("\n✗ Error in pdflatex pass\n", "red")
+                    return False
+                return True
 
-        except Exception as e:
-            error_msg = f"\n✗ Error generating PDF: {str(e)}\n"
-            self.write(error_msg, "red")
+            def on_complete(worker):
+                if not worker.result:
+                    return
+                pdf_file = base_filename + '.pdf'
+                if not os.path.exists(pdf_file):
+                    self.write("\n✗ Error: PDF file not found after compilation\n", "red")
+                    return
 
-            # Add detailed error information
-            if hasattr(e, '__traceback__'):
-                self.write("\nDetailed error information:\n", "red")
-                self.write(traceback.format_exc(), "red")
+                # Calculate file size
+                size = os.path.getsize(pdf_file)
+                size_str = self.format_file_size(size)
 
-            messagebox.showerror("Error", f"Error generating PDF:\n{str(e)}")
+                self.write("\n✓ PDF generated successfully!\n", "green")
+                self.write(f"PDF Size: {size_str}\n", "green")
+
+                # Check for any warnings in the log file
+                log_file = base_filename + '.log'
+                if os.path.exists(log_file):
+                    self.check_latex_log(log_file)
+
+                if on_success:
+                    on_success()
+                else:
+                    self.handle_pdf_completion(pdf_file, size_str)
+
+            self.start_compile_job(job, on_complete)
+
+        except Exception as e:
+            self.handle_compilation_error(e)
 
     def check_latex_log(self, log_file: str) -> None:
         """Check LaTeX log file for warnings and errors"""
@@ -4795,66 +5049,47 @@ Created by {self.__author__}
             print(f"Error writing to terminal: {str(e)}", file=sys.__stdout__)
 
 
-    def run_pdflatex(self, tex_file: str) -> bool:
-        """Run pdflatex with output to terminal"""
-        global original_dir
-        # Store original directory
-        original_dir = os.getcwd()
-        try:
-
-            # Change to tex file directory
-            tex_dir = os.path.dirname(tex_file) or '.'
-            os.chdir(tex_dir)
-
-            # Update working directory in terminal
-            self.terminal.set_working_directory(tex_dir)
-
-            # Start pdflatex process
-            self.current_process = subprocess.Popen(
-                ['pdflatex', '-interaction=nonstopmode', tex_file],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
-
-            # Read output in real-time
-            while True:
-                line = self.current_process.stdout.readline()
-                if not line and self.current_process.poll() is not None:
-                    break
-
-                if line:
-                    # Color code the output
-                    if any(err in line for err in ['Error:', '!', 'Fatal error']):
-                        self.write(line, "red")
-                    elif 'Warning' in line:
-                        self.write(line, "yellow")
-                    else:
-                        self.write(line)
-
-                    # Keep UI responsive
-                    self.update_idletasks()
+    def start_compile_job(self, job, on_complete) -> bool:
+        """
+        Run job(worker) in a background CompileWorker and stream its output
+        to the terminal. on_complete(worker) runs on the UI thread afterwards.
+        """
+        worker = getattr(self, 'compile_worker', None)
+        if worker and worker.is_running():
+            self.write("\nA compilation is already running. Stop it first.\n", "yellow")
+            return False
 
-            # Get process result
-            return_code = self.current_process.wait()
-            self.current_process = None
+        self.compile_worker = CompileWorker(job).start()
+        self.after(self.COMPILE_POLL_MS, self._poll_compile_worker, self.compile_worker, on_complete)
+        return True
 
-            return return_code == 0
+    def _poll_compile_worker(self, worker, on_complete) -> None:
+        """Drain queued compiler output in batches until the worker finishes"""
+        for text, color in worker.drain():
+            self.write(text, color)
+        for action, data in worker.drain_events():
+            self.ide_callback(action, data)
 
-        except Exception as e:
-            self.write(f"\nProcess error: {str(e)}\n", "red")
-            if self.current_process:
-                self.current_process = None
-            return False
+        if worker.is_running() or not worker.lines.empty() or not worker.events.empty():
+            self.after(self.COMPILE_POLL_MS, self._poll_compile_worker, worker, on_complete)
+            return
 
-        finally:
+        if self.compile_worker is worker:
+            self.compile_worker = None
 
-            # Restore original directory
-            os.chdir(original_dir)
-            self.terminal.set_working_directory(original_dir)
+        if worker.error:
+            self.handle_compilation_error(worker.error)
+        elif worker.cancelled:
+            self.write("\n✗ Compilation cancelled\n", "yellow")
+        else:
+            on_complete(worker)
 
+    def run_pdflatex(self, tex_file: str, on_complete=None) -> bool:
+        """Run one pdflatex pass in the background with output to terminal"""
+        return self.start_compile_job(
+            lambda worker: worker.run_pass(tex_file),
+            on_complete or (lambda worker: None)
+        )
 
 
     def handle_pdf_completion(self, pdf_file: str, size_str: str) -> None:
@@ -4869,9 +5104,9 @@ Created by {self.__author__}
         self.write_to_terminal(f"\n✗ {error_msg}", "red")
 
         # Add detailed error information to terminal
-        if hasattr(error, '__traceback__'):
+        if getattr(error, '__traceback__', None):
             self.write_to_terminal("\nDetailed error information:\n", "red")
-            self.write_to_terminal(traceback.format_exc(), "red")
+            self.write_to_terminal(''.join(traceback.format_exception(type(error), error, error.__traceback__)), "red")
 
         messagebox.showerror("Error", f"Error generating PDF:\n{str(error)}")
 #------------------------------------------------------------------------------------------------------------------
@@ -4902,10 +5137,10 @@ Created by {self.__author__}
 
             # Compile with specified mode
             self.write(f"\nCompiling presentation in {mode} mode...\n", "white")
-            try:
-                pdf_file = compile_with_notes_mode(tex_file, mode)
 
-                if os.path.exists(pdf_file):
+            def on_complete(worker):
+                pdf_file = worker.result
+                if pdf_file and os.path.exists(pdf_file):
                     size = os.path.getsize(pdf_file)
                     size_str = self.format_file_size(size)
 
@@ -4919,14 +5154,70 @@ Created by {self.__author__}
                 else:
                     self.write("\n✗ Error: PDF file not found after compilation\n", "red")
 
-            except Exception as e:
-                self.write(f"\n✗ Error in compilation: {str(e)}\n", "red")
-                messagebox.showerror("Error", f"Error compiling PDF:\n{str(e)}")
+            self.start_compile_job(
+                lambda worker: compile_with_notes_mode(tex_file, mode, worker=worker),
+                on_complete
+            )
+
+        except Exception as e:
+            self.write(f"\n✗ Error: {str(e)}\n", "red")
+            messagebox.showerror("Error", f"Error generating PDF:\n{str(e)}")
+
+    def compile_all_modes(self) -> None:
+        """
+        Convert once, then build the slides, notes and both PDFs concurrently.
+        """
+        if not self.current_file:
+            messagebox.showwarning("Warning", "Please save your file first!")
+            return
+
+        try:
+            # Save current state
+            self.save_current_slide()
+            self.save_file()
+
+            tex_file = os.path.splitext(self.current_file)[0] + '.tex'
+
+            # Clear terminal
+            self.clear_terminal()
+
+            self.write("Converting text to TEX...\n", "white")
+            self.convert_to_tex()
+
+            self.write("\nBuilding slides, notes and both in parallel...\n", "white")
+
+            def on_complete(worker):
+                results = worker.result or {}
+                built = [pdf for pdf in results.values() if pdf]
+                if len(built) == len(results) and built:
+                    self.write(f"\n✓ All {len(built)} PDFs generated\n", "green")
+                else:
+                    failed = [mode for mode, pdf in results.items() if not pdf]
+                    self.write(f"\n✗ Failed modes: {', '.join(failed)}\n", "red")
+
+            self.start_compile_job(
+                lambda worker: worker.build_all_modes(tex_file),
+                on_complete
+            )
 
         except Exception as e:
             self.write(f"\n✗ Error: {str(e)}\n", "red")
             messagebox.showerror("Error", f"Error generating PDF:\n{str(e)}")
 
+    def clean_build(self) -> None:
+        """Remove the persistent .bsg-build files of the current deck"""
+        if not self.current_file:
+            messagebox.showwarning("Warning", "Please save your file first!")
+            return
+
+        worker = getattr(self, 'compile_worker', None)
+        if worker and worker.is_running():
+            self.write("\nA compilation is running. Stop it before cleaning.\n", "yellow")
+            return
+
+        clean_build_dir(os.path.splitext(self.current_file)[0] + '.tex')
+        self.write("\n✓ Build files removed; the next compile starts from scratch\n", "green")
+
     def set_notes_mode(self, mode: str) -> None:
         """Set notes mode and update UI"""
         self.notes_mode.set(mode)
@@ -4936,6 +5227,95 @@ Created by {self.__author__}
         if self.current_file:
             self.compile_presentation(mode)
 
+    def get_preview_preamble(self) -> str:
+        """
+        Preamble for single-slide previews, up to and including \\begin{document}.
+        Taken from the last conversion when there is one so custom preambles
+        and logos match the full build.
+        """
+        text = None
+        tex_file = os.path.splitext(self.current_file)[0] + '.tex'
+        if os.path.exists(tex_file):
+            with open(tex_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+        if not text or "\\begin{document}" not in text:
+            text = self.get_custom_preamble()
+
+        doc_pos = text.find("\\begin{document}")
+        preamble = (text[:doc_pos] if doc_pos != -1 else text) + "\\begin{document}\n"
+        if '\\newcommand{\\spotlight}' not in text:
+            preamble += generate_special_commands()
+        return preamble
+
+    def preview_current_slide(self) -> None:
+        """Compile only the current slide in the background and show it in a window"""
+        if not self.current_file:
+            messagebox.showwarning("Warning", "Please save your file first!")
+            return
+        if self.current_slide_index < 0 or self.current_slide_index >= len(self.slides):
+            messagebox.showwarning("Warning", "No slide selected!")
+            return
+
+        try:
+            self.save_current_slide()
+            slide = self.slides[self.current_slide_index]
+            title, content, media = slide.title, list(slide.content), slide.media
+            started = time.perf_counter()
+
+            preamble = self.get_preview_preamble()
+            deck_file = os.path.splitext(self.current_file)[0] + '.tex'
+
+            self.write(f"\nPreviewing slide {self.current_slide_index + 1}...\n", "white")
+
+            def job(worker):
+                # Media downloads and preview frames happen here, off the UI thread;
+                # with an on_event listener missing media never prompts.
+                # Notes are hidden in the preview, so they are not generated.
+                frame_latex, _ = generate_frame_latex(title, content, [], media,
+                                                      on_event=worker.post_event)
+                if not frame_latex:
+                    worker.emit("✗ Could not generate LaTeX for this slide\n", "red")
+                    return None
+                pdf_file = worker.build_frame_preview(deck_file, preamble, frame_latex)
+                if not pdf_file:
+                    return None
+                return pdf_file, render_pdf_page(pdf_file)
+
+            def on_complete(worker):
+                if not worker.result:
+                    self.write("✗ Slide preview failed; see the log above\n", "red")
+                    return
+                pdf_file, image = worker.result
+                elapsed = time.perf_counter() - started
+                self.write(f"✓ Slide preview ready in {elapsed:.2f}s\n", "green")
+                if image is None:
+                    # PyMuPDF unavailable, fall back to the system viewer
+                    self.preview_pdf(pdf_file)
+                else:
+                    self.show_slide_preview(image)
+
+            self.start_compile_job(job, on_complete)
+
+        except Exception as e:
+            self.write(f"\n✗ Error previewing slide: {str(e)}\n", "red")
+
+    def show_slide_preview(self, image) -> None:
+        """Show a rendered slide in the (reused) preview window"""
+        window = getattr(self, 'slide_preview_window', None)
+        if window is None or not window.winfo_exists():
+            window = self.slide_preview_window = ctk.CTkToplevel(self)
+            window.title("Slide Preview")
+            window.preview_label = ctk.CTkLabel(window, text="")
+            window.preview_label.pack(fill="both", expand=True, padx=5, pady=5)
+
+        width = min(image.width, 900)
+        height = int(image.height * width / image.width)
+        preview_image = ctk.CTkImage(light_image=image, dark_image=image, size=(width, height))
+        window.preview_label.configure(image=preview_image)
+        window.preview_label.image = preview_image  # keep a reference
+        window.title(f"Slide Preview - Slide {self.current_slide_index + 1}")
+        window.lift()
+
     def preview_pdf(self, pdf_file: str = None) -> None:
         """Preview generated PDF using system default PDF viewer"""
         if not pdf_file:
@@ -4964,11 +5344,7 @@ Created by {self.__author__}
         """Create new slide"""
         self.save_current_slide()
 
-        new_slide = {
-            'title': 'New Slide',
-            'media': '',
-            'content': []
-        }
+        new_slide = Slide('New Slide')
 
         self.slides.append(new_slide)
         self.current_slide_index = len(self.slides) - 1
@@ -5007,13 +5383,12 @@ Created by {self.__author__}
 
     def on_slide_select(self, event) -> None:
         """Handle slide selection from list"""
-        index = self.slide_list.index("@%d,%d" % (event.x, event.y)).split('.')[0]
-        index = int(index)
+        index = self.slide_list.index_at(event.x, event.y)
         if 0 <= index < len(self.slides):
             self.save_current_slide()
             self.current_slide_index = index
             self.load_slide(index)
-            self.update_slide_list()
+            self.highlight_current_slide()
 
 
 
@@ -5033,12 +5408,12 @@ Created by {self.__author__}
 
         # Only save if there is actual content and within valid index
         if (title or media or content or notes) and self.current_slide_index < len(self.slides):
-            self.slides[self.current_slide_index] = {
-                'title': title,
-                'media': media,
-                'content': content,
-                'notes': notes
-            }
+            slide = self.slides[self.current_slide_index]
+            # The editor shows \None for slides without media; keep the slide's own
+            # spelling ('' or \None) so merely visiting a slide does not dirty it
+            if media == "\\None" and slide.media in ('', "\\None"):
+                media = slide.media
+            slide.update(title, media, content, notes)
 
     def clear_editor(self) -> None:
         """Clear editor fields"""
@@ -5101,21 +5476,21 @@ Created by {self.__author__}
         # Add slides with appropriate notes handling
         for slide in self.slides:
             content += f"\\begin{frame}\n"
-            content += f"\\frametitle{{{slide['title']}}}\n"
+            content += f"\\frametitle{{{slide.title}}}\n"
 
-            if slide['media']:
-                content += f"{slide['media']}\n"
+            if slide.media:
+                content += f"{slide.media}\n"
 
-            for item in slide['content']:
+            for item in slide.content:
                 if item.strip():
                     content += f"{item}\n"
 
             content += "\\end{frame}\n"
 
             # Add notes if not in slides_only mode
-            if self.notes_mode.get() != "slides_only" and 'notes' in slide and slide['notes']:
+            if self.notes_mode.get() != "slides_only" and slide.notes:
                 content += "\\note{\n\\begin{itemize}\n"
-                for note in slide['notes']:
+                for note in slide.notes:
                     if note.strip():
                         note = note.lstrip('•- ').strip()
                         content += f"\\item {note}\n"
@@ -5161,8 +5536,12 @@ Created by {self.__author__}
     def load_file(self, filename: str) -> None:
         """Load presentation from file with notes support"""
         try:
-            with open(filename, 'r') as f:
-                content = f.read()
+            # Keep the file's bytes so unchanged slides can be copied on save
+            with open(filename, 'rb') as f:
+                source_bytes = f.read()
+            parser = DeckParser(io.StringIO(source_bytes.decode('utf-8'), newline=''))
+            records = list(parser)
+            self.source_bytes = source_bytes
 
             # Parse content
             self.current_file = filename
@@ -5170,52 +5549,20 @@ Created by {self.__author__}
             self.current_slide_index = -1
 
             # Extract presentation info
-            import re
             for key in self.presentation_info:
-                pattern = f"\\\\{key}{{(.*?)}}"
-                match = re.search(pattern, content)
-                if match:
-                    self.presentation_info[key] = match.group(1)
-
-            # Extract slides with notes using enhanced pattern
-            slide_pattern = r"\\title\s+(.*?)\n\\begin{Content}(.*?)\\end{Content}(?:\s*\\begin{Notes}(.*?)\\end{Notes})?"
-            slide_matches = re.finditer(slide_pattern, content, re.DOTALL)
-
-            for match in slide_matches:
-                title = match.group(1).strip()
-                content_block = match.group(2).strip()
-                notes_block = match.group(3).strip() if match.group(3) else ""
-
-                # Extract media directive if present
-                media = ""
-                content_lines = []
-                first_line = content_block.split('\n')[0].strip()
-                if first_line.startswith('\\'):
-                    media = first_line
-                    content_lines = content_block.split('\n')[1:]
-                else:
-                    content_lines = content_block.split('\n')
-
-                # Process notes
-                notes_lines = []
-                if notes_block:
-                    notes_lines = [line.strip() for line in notes_block.split('\n') if line.strip()]
-
-                self.slides.append({
-                    'title': title,
-                    'media': media,
-                    'content': [line for line in content_lines if line.strip()],
-                    'notes': notes_lines
-                })
+                if key in parser.metadata:
+                    self.presentation_info[key] = parser.metadata[key]
+
+            self.slides = [Slide.from_record(record) for record in records]
 
             if self.slides:
                 self.current_slide_index = 0
                 self.load_slide(0)
 
                 # Display notes if present
-                if self.slides[0].get('notes'):
+                if self.slides[0].notes:
                     self.notes_editor.delete('1.0', 'end')
-                    for note in self.slides[0]['notes']:
+                    for note in self.slides[0].notes:
                         self.notes_editor.insert('end', f"{note}\n")
 
             self.update_slide_list()
@@ -5390,14 +5737,11 @@ Created by {self.__author__}
             pdf_file = base_filename + '.pdf'
             abs_pdf_path = os.path.abspath(pdf_file)
 
-            # Check if PDF exists and generate if needed
+            # Check if PDF exists and generate if needed; presenting resumes once it is built
             if not os.path.exists(abs_pdf_path):
                 self.write_to_terminal("PDF not found. Generating...")
-                self.generate_pdf()
-
-                if not os.path.exists(abs_pdf_path):
-                    messagebox.showerror("Error", "Failed to generate PDF presentation.")
-                    return
+                self.generate_pdf(on_success=self.present_with_notes)
+                return
 
             # Get virtual environment path
             venv_path = Path.home() / 'my_python'
@@ -5475,98 +5819,22 @@ Created by {self.__author__}
             messagebox.showerror("Error", f"Error launching presentation:\n{str(e)}")
             traceback.print_exc()
 #-----------------------------------------------Help Functions --------------------------------------------
-def modify_preamble_for_notes_mode(tex_content: str, mode: str) -> str:
-    """
-    Modify preamble based on notes mode while preserving original content.
-
-    Args:
-        tex_content: Original TEX content
-        mode: 'slides', 'notes', or 'both'
-    Returns:
-        Modified TEX content
-    """
-    # First find document begin position
-    doc_pos = tex_content.find("\\begin{document}")
-    if doc_pos == -1:
-        return tex_content
-
-    # Split content into preamble and document
-    preamble = tex_content[:doc_pos]
-    document = tex_content[doc_pos:]
-
-    # Define notes configurations
-    notes_configs = {
-        "slides": "\\setbeameroption{hide notes}",
-        "notes": "\\setbeameroption{show only notes}",
-        "both": "\\setbeameroption{show notes on second screen=right}"
-    }
-
-    # Remove any existing notes configurations
-    preamble = re.sub(r'\\setbeameroption{[^}]*}', '', preamble)
-
-    # Ensure pgfpages package
-    if "\\usepackage{pgfpages}" not in preamble:
-        preamble = preamble.rstrip() + "\n\\usepackage{pgfpages}\n"
-
-    # Add appropriate notes configuration
-    notes_config = notes_configs.get(mode, notes_configs['both'])
-    preamble = preamble.rstrip() + f"\n\n% Notes configuration\n{notes_config}\n"
-
-    # Add template style
-    preamble += "\\setbeamertemplate{note page}{\\pagecolor{yellow!5}\\insertnote}\n"
-
-    return preamble + document
-
-def compile_with_notes_mode(input_file: str, mode: str, keep_temp: bool = False) -> str:
+def compile_with_notes_mode(input_file: str, mode: str, clean: bool = False, worker=None) -> str:
     """
     Compile TEX file with specified notes mode.
 
     Args:
         input_file: Path to input TEX file
         mode: 'slides', 'notes', or 'both'
-        keep_temp: Whether to keep temporary files
+        clean: Discard the persistent .bsg-build files and compile from scratch
+        worker: Optional CompileWorker used to stream the pdflatex log
     Returns:
         Path to generated PDF
     """
-    try:
-        # Create temp directory for compilation
-        temp_dir = tempfile.mkdtemp()
-        base_name = os.path.splitext(os.path.basename(input_file))[0]
-        temp_tex = os.path.join(temp_dir, f"{base_name}_{mode}.tex")
-        output_pdf = os.path.join(temp_dir, f"{base_name}_{mode}.pdf")
-
-        # Read original content
-        with open(input_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Modify content for notes mode
-        modified_content = modify_preamble_for_notes_mode(content, mode)
-
-        # Write modified content to temp file
-        with open(temp_tex, 'w', encoding='utf-8') as f:
-            f.write(modified_content)
-
-        # Copy required media files to temp directory
-        media_dir = os.path.join(os.path.dirname(input_file), 'media_files')
-        if os.path.exists(media_dir):
-            temp_media = os.path.join(temp_dir, 'media_files')
-            shutil.copytree(media_dir, temp_media)
-
-        # Compile document
-        os.chdir(temp_dir)
-        for _ in range(2):  # Two passes for references
-            subprocess.run(['pdflatex', '-interaction=nonstopmode', temp_tex],
-                         stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-        # Move final PDF to original directory
-        final_pdf = os.path.join(os.path.dirname(input_file), f"{base_name}_{mode}.pdf")
-        shutil.copy2(output_pdf, final_pdf)
-
-        return final_pdf
-
-    finally:
-        if not keep_temp:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+    # Builds run in .bsg-build/<deck>/<mode>, keeping aux files between runs
+    if worker:
+        return worker.build_notes_mode(input_file, mode, clean=clean)
+    return build_notes_mode(input_file, mode, clean=clean)
 
 #----------------------------------------------Interactive Terminal ------------------------------------
 import customtkinter as ctk
@@ -5611,6 +5879,9 @@ class InteractiveTerminal(ctk.CTkFrame):
         # Control buttons
         ctk.CTkButton(header, text="Clear",
                      command=self.clear).pack(side="right", padx=5)
+        if hasattr(self.master, 'stop_compilation'):
+            ctk.CTkButton(header, text="Stop",
+                         command=self.master.stop_compilation).pack(side="right", padx=5)
 
         # Terminal display
         self.display = ctk.CTkTextbox(
@@ -5915,6 +6186,23 @@ class SessionManager:
 #---------------------------------------------------------------------------------
 
 
+def render_pdf_page(pdf_file: str, page_number: int = 0, zoom: float = 2.0):
+    """
+    Render one PDF page to a PIL image with PyMuPDF.
+    Returns None when PyMuPDF is not available.
+    """
+    try:
+        import fitz
+    except ImportError:
+        return None
+
+    doc = fitz.open(pdf_file)
+    try:
+        pix = doc[page_number].get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    finally:
+        doc.close()
+
 def verify_pymupdf_installation():
     """
     Verify PyMuPDF is installed correctly and usable.
@@ -5953,50 +6241,28 @@ def get_pymupdf_info():
 
 def import_required_packages():
     """
-    Import all required packages with proper error handling and verification.
+    Return the IDE's feature packages. The GUI toolkit is imported now;
+    PyMuPDF, OpenCV, yt-dlp, requests and screeninfo are lazy modules that
+    load on first use, so features that are never used cost nothing.
     """
-    try:
-        # First verify PyMuPDF
-        if not verify_pymupdf_installation():
-            raise ImportError("PyMuPDF installation verification failed")
-
-        # Now import everything else
-        import tkinter as tk
-        from PIL import Image, ImageDraw, ImageTk
-        import customtkinter as ctk
-        from tkinter import ttk, filedialog, messagebox, simpledialog
-        import screeninfo
-        import requests
-        import cv2
-        import yt_dlp
-        import fitz
-
-        modules = {
-            'tk': tk,
-            'Image': Image,
-            'ImageDraw': ImageDraw,
-            'ImageTk': ImageTk,
-            'ctk': ctk,
-            'ttk': ttk,
-            'fitz': fitz,
-            'screeninfo': screeninfo,
-            'requests': requests,
-            'cv2': cv2,
-            'yt_dlp': yt_dlp
-        }
-
-        # Print success message with version info
-        print(f"\nSuccessfully imported all packages:")
-        print(f"PyMuPDF version: {fitz.version[0]}")
-        print(f"PIL version: {Image.__version__}")
-        print(f"OpenCV version: {cv2.__version__}")
-
-        return modules
-
-    except Exception as e:
-        print(f"Error importing required packages: {str(e)}")
-        traceback.print_exc()
-        sys.exit(1)
+    import tkinter as tk
+    from PIL import Image
+    import customtkinter as ctk
+    from tkinter import ttk
+
+    return {
+        'tk': tk,
+        'Image': Image,
+        'ImageDraw': lazy_import('PIL.ImageDraw'),
+        'ImageTk': lazy_import('PIL.ImageTk'),
+        'ctk': ctk,
+        'ttk': ttk,
+        'fitz': lazy_import('fitz'),
+        'screeninfo': lazy_import('screeninfo'),
+        'requests': lazy_import('requests'),
+        'cv2': lazy_import('cv2'),
+        'yt_dlp': lazy_import('yt_dlp')
+    }
 
 
 
@@ -6080,6 +6346,16 @@ def update_installation():
             required_files = [
                 'BSG_IDE.py',
                 'BeamerSlideGenerator.py',
+                'BSG_environment.py',
+                'BSG_build.py',
+                'BSG_compiler.py',
+                'BSG_fetch.py',
+                'BSG_lazy.py',
+                'BSG_media_cache.py',
+                'BSG_parser.py',
+                'BSG_spellcheck.py',
+                'BSG_thumbnails.py',
+                'BSG_trace.py',
                 'requirements.txt'
             ]
 
@@ -6836,6 +7112,8 @@ try:
         get_beamer_preamble,
         process_media,
         generate_latex_code,
+        generate_frame_latex,
+        generate_special_commands,
         download_youtube_video,
         construct_search_query,
         open_google_image_search
@@ -7033,20 +7311,26 @@ class EnhancedNotesEditor(ctk.CTkFrame):
         }
 
         # Update highlighter
-        self.highlighter.patterns.extend(additional_patterns)
-        self.highlighter.colors.update(additional_colors)
+        self.highlighter.add_patterns(additional_patterns, additional_colors)
 
 #------------------------------------------------------------------------------------------
 class FileThumbnailBrowser(ctk.CTkToplevel):
+    # Interval for collecting finished thumbnails from the background pool
+    THUMBNAIL_POLL_MS = 50
+
     def __init__(self, parent, initial_dir="media_files", callback=None):
         super().__init__(parent)
 
         # Import required modules
+        self.thumbnail_loader = None
         try:
             from PIL import Image, ImageDraw, ImageFont
+            from BSG_thumbnails import ThumbnailLoader, renderer_for
+            self.renderer_for = renderer_for
             self.Image = Image
             self.ImageDraw = ImageDraw
             self.ImageFont = ImageFont
+            self.thumbnail_loader = ThumbnailLoader()
             self.has_pil = True
         except ImportError as e:
             print(f"Error importing PIL modules: {e}")
@@ -7061,6 +7345,9 @@ class FileThumbnailBrowser(ctk.CTkToplevel):
         self.current_dir = os.path.abspath(initial_dir)
         self.callback = callback
         self.thumbnails = []
+        self.pending_thumbnails = {}  # file path -> button awaiting its thumbnail
+        self.generic_thumbnails = {}
+        self.thumbnail_poll_id = None
         self.current_row = 0
         self.current_col = 0
         self.max_cols = 4
@@ -7090,53 +7377,35 @@ class FileThumbnailBrowser(ctk.CTkToplevel):
 
         try:
             category = self.get_file_category(file_path)
-            thumb_size = (150, 150)
 
-            if category == 'image':
-                try:
-                    with self.Image.open(file_path) as img:
-                        # Convert to RGB if necessary
-                        if img.mode in ('RGBA', 'P'):
-                            img = img.convert('RGB')
-
-                        # Create thumbnail
-                        img.thumbnail(thumb_size, self.Image.Resampling.LANCZOS)
-
-                        # Create background
-                        thumb_bg = self.Image.new('RGB', thumb_size, 'black')
-
-                        # Center image on background
-                        offset = ((thumb_size[0] - img.size[0]) // 2,
-                                (thumb_size[1] - img.size[1]) // 2)
-                        thumb_bg.paste(img, offset)
-
-                        return ctk.CTkImage(light_image=thumb_bg,
-                                          dark_image=thumb_bg,
-                                          size=thumb_size)
-                except Exception as e:
-                    print(f"Error creating image thumbnail: {str(e)}")
-                    return self.create_generic_thumbnail("Image\nError", "#8B0000")
+            # Images, video frames and PDF pages are rendered in the background;
+            # the generic tile is shown until (or if no) real thumbnail arrives
+            colors = {
+                'image': "#606060",
+                'video': "#4a90e2",
+                'audio': "#e24a90",
+                'document': "#90e24a",
+                'data': "#4ae290"
+            }
+            color = colors.get(category, "#808080")
+            text = category.upper() if category else "FILE"
 
-            else:
-                # Create appropriate generic thumbnail based on category
-                colors = {
-                    'video': "#4a90e2",
-                    'audio': "#e24a90",
-                    'document': "#90e24a",
-                    'data': "#4ae290"
-                }
-                color = colors.get(category, "#808080")
-                text = category.upper() if category else "FILE"
-                return self.create_generic_thumbnail(text, color)
+            renderer = self.renderer_for(file_path)
+            if renderer:
+                self.thumbnail_loader.submit(file_path, renderer)
+                self.schedule_thumbnail_poll()
+            return self.create_generic_thumbnail(text, color)
 
         except Exception as e:
             print(f"Error creating thumbnail for {file_path}: {str(e)}")
             return self.create_fallback_thumbnail()
 
     def create_generic_thumbnail(self, text, color):
-        """Create generic thumbnail with text"""
+        """Create generic thumbnail with text, shared by all items that use it"""
         if not self.has_pil:
             return self.create_fallback_thumbnail()
+        if (text, color) in self.generic_thumbnails:
+            return self.generic_thumbnails[(text, color)]
 
         try:
             thumb_size = (150, 150)
@@ -7160,9 +7429,11 @@ class FileThumbnailBrowser(ctk.CTkToplevel):
 
             draw.text((text_x, text_y), text, fill="white")
 
-            return ctk.CTkImage(light_image=img,
-                              dark_image=img,
-                              size=thumb_size)
+            thumbnail = ctk.CTkImage(light_image=img,
+                                   dark_image=img,
+                                   size=thumb_size)
+            self.generic_thumbnails[(text, color)] = thumbnail
+            return thumbnail
         except Exception as e:
             print(f"Error creating generic thumbnail: {str(e)}")
             return self.create_fallback_thumbnail()
@@ -7180,6 +7451,39 @@ class FileThumbnailBrowser(ctk.CTkToplevel):
                               dark_image=None,
                               size=(150, 150))
 
+    def schedule_thumbnail_poll(self):
+        if self.thumbnail_poll_id is None:
+            self.thumbnail_poll_id = self.after(self.THUMBNAIL_POLL_MS, self.poll_thumbnails)
+
+    def poll_thumbnails(self):
+        """Put finished background thumbnails onto their buttons"""
+        self.thumbnail_poll_id = None
+        for generation, file_path, image in self.thumbnail_loader.results():
+            if generation != self.thumbnail_loader.generation:
+                continue
+            button = self.pending_thumbnails.pop(file_path, None)
+            if button is None or not button.winfo_exists():
+                continue
+            if image is None:
+                if self.get_file_category(file_path) != 'image':
+                    continue  # Keep the generic video/document tile
+                thumbnail = self.create_generic_thumbnail("Image\nError", "#8B0000")
+            else:
+                thumbnail = ctk.CTkImage(light_image=image, dark_image=image, size=image.size)
+            button.configure(image=thumbnail)
+            self.thumbnails.append(thumbnail)
+
+        if self.pending_thumbnails or self.thumbnail_loader.busy():
+            self.schedule_thumbnail_poll()
+
+    def destroy(self):
+        if self.thumbnail_poll_id is not None:
+            self.after_cancel(self.thumbnail_poll_id)
+            self.thumbnail_poll_id = None
+        if self.thumbnail_loader:
+            self.thumbnail_loader.shutdown()
+        super().destroy()
+
 #-------------------------------------------------------------------------------------------
 
 
@@ -7192,7 +7496,7 @@ class FileThumbnailBrowser(ctk.CTkToplevel):
 
             file_path = os.path.join(self.current_dir, file_name)
 
-            # Create thumbnail
+            # Create thumbnail (images get a placeholder and are filled in later)
             try:
                 thumbnail = self.create_thumbnail(file_path)
             except Exception as e:
@@ -7210,6 +7514,8 @@ class FileThumbnailBrowser(ctk.CTkToplevel):
                     height=150
                 )
                 thumb_button.pack(pady=(5, 0))
+                if self.has_pil and self.renderer_for(file_path):
+                    self.pending_thumbnails[file_path] = thumb_button
 
                 # Add filename label
                 label = ctk.CTkLabel(
@@ -7445,6 +7751,10 @@ class FileThumbnailBrowser(ctk.CTkToplevel):
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
         self.thumbnails.clear()
+        self.pending_thumbnails.clear()
+        if self.thumbnail_loader:
+            # Results still in flight belong to the previous listing
+            self.thumbnail_loader.cancel()
         self.current_row = 0
         self.current_col = 0
 
@@ -8187,6 +8497,16 @@ except Exception as e:
             required_files = {
                 'BSG_IDE.py': ['base', 'python_site'],
                 'BeamerSlideGenerator.py': ['base', 'python_site'],
+                'BSG_environment.py': ['base', 'python_site'],
+                'BSG_build.py': ['base', 'python_site'],
+                'BSG_compiler.py': ['base', 'python_site'],
+                'BSG_fetch.py': ['base', 'python_site'],
+                'BSG_lazy.py': ['base', 'python_site'],
+                'BSG_media_cache.py': ['base', 'python_site'],
+                'BSG_parser.py': ['base', 'python_site'],
+                'BSG_spellcheck.py': ['base', 'python_site'],
+                'BSG_thumbnails.py': ['base', 'python_site'],
+                'BSG_trace.py': ['base', 'python_site'],
                 'requirements.txt': ['base'],
                 'airis4d_logo.png': ['base', 'resources', 'share'],  # Added multiple destinations
                 'bsg-ide.png': ['base', 'resources', 'share']
@@ -8594,6 +8914,15 @@ def main():
 
         args = parser.parse_args()
 
+        if args.verify:
+            success = verify_installation()
+            if missing_requirements:
+                print("\nMissing packages:")
+                for spec, module in missing_requirements:
+                    print(f"✗ {spec} (import {module})")
+                print("Run 'bsg-ide --fix' to install them")
+            sys.exit(0 if success and not missing_requirements else 1)
+
         if args.fix or args.install:
             #from installation import install_bsg_ide
             success = install_bsg_ide(fix_mode=args.fix)
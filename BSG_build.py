@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+BSG_build.py
+Non-interactive batch builds: `bsg build`.
+
+    bsg build course/ extra/talk.txt --jobs 8 --no-network
+
+Each deck (.txt source) is converted to TeX and then compiled in every
+requested notes mode. Conversions and compilations are independent tasks
+in one process pool, so a catalog of decks keeps every core busy. Missing
+media never prompts: the slide falls back to \\None and is listed in the
+deck's summary. One JSON summary per deck is printed to stdout (JSON Lines)
+and written to .bsg-build/<deck>/summary.json; progress goes to stderr.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+import BSG_trace
+from BSG_compiler import NOTES_MODES, BUILD_DIR_NAME, build_root, build_notes_mode
+
+SUMMARY_FILE = 'summary.json'
+SKIP_DIRS = (BUILD_DIR_NAME, 'media_files', '__pycache__', '.git')
+
+
+def is_deck(path: Path) -> bool:
+    """Whether path is a BSG presentation source (has at least one Content block)"""
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return any(line.lstrip().startswith('\\begin{Content}') for line in f)
+    except OSError:
+        return False
+
+
+def find_decks(paths) -> list:
+    """Deck files named in paths; directories are searched recursively"""
+    decks = []
+    for name in paths:
+        path = Path(name)
+        if path.is_dir():
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+                for file in sorted(files):
+                    candidate = Path(root) / file
+                    if candidate.suffix == '.txt' and is_deck(candidate):
+                        decks.append(candidate)
+        elif path.is_file():
+            decks.append(path)
+        else:
+            print(f"Warning: {name} does not exist", file=sys.stderr)
+
+    unique = []
+    for deck in decks:
+        deck = str(deck.resolve())
+        if deck not in unique:
+            unique.append(deck)
+    return unique
+
+
+def _init_worker(no_network: bool, trace: bool = False) -> None:
+    # Workers hand their trace events back with each result instead of exporting them
+    if trace:
+        BSG_trace.enable()
+    else:
+        BSG_trace.disable()
+    if no_network:
+        os.environ['BSG_OFFLINE'] = '1'
+        from BSG_media_cache import set_offline_mode
+        set_offline_mode(True)
+
+
+@contextlib.contextmanager
+def _log_to(deck: str, name: str):
+    """Send this task's output to .bsg-build/<deck>/<name>.log"""
+    root = build_root(deck)
+    os.makedirs(root, exist_ok=True)
+    log_path = os.path.join(root, f"{name}.log")
+    with open(log_path, 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        yield log_path, log
+
+
+def convert_deck(deck: str, use_cache: bool = True) -> dict:
+    """Convert deck to <deck>.tex in a worker process"""
+    from BeamerSlideGenerator import process_input_file
+
+    tex_file = os.path.splitext(deck)[0] + '.tex'
+    result = {'tex': tex_file, 'processed': 0, 'failed': 0, 'errors': [], 'missing_media': []}
+    started = time.perf_counter()
+
+    with _log_to(deck, 'convert') as (log_path, log):
+        def on_event(action, data):
+            if action == "missing_media":
+                result['missing_media'].append({'title': data.get('title'), 'media': data.get('media')})
+                log.write(f"Missing media for {data.get('title')!r}: {data.get('media')}\n")
+            elif action == "message":
+                log.write(data.get('text', ''))
+            elif action == "error":
+                log.write(f"Error: {data.get('message')}\n")
+
+        try:
+            # Media paths in decks are relative to the deck's folder
+            os.chdir(os.path.dirname(deck))
+            processed, failed, errors = process_input_file(
+                deck, tex_file, ide_callback=on_event, use_cache=use_cache)
+            result.update(processed=processed, failed=failed, errors=list(errors))
+        except Exception as e:
+            result['errors'].append(f"Error converting {deck}: {str(e)}")
+
+    result['log'] = log_path
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    if BSG_trace.is_enabled():
+        result['trace'] = BSG_trace.take_events()
+    return result
+
+
+def compile_deck(deck: str, tex_file: str, mode: str) -> dict:
+    """Compile one notes mode of a converted deck in a worker process"""
+    started = time.perf_counter()
+    result = {'mode': mode, 'pdf': None, 'error': None}
+    with _log_to(deck, mode) as (log_path, log), \
+            BSG_trace.span('compile', mode=mode, deck=os.path.basename(deck)):
+        try:
+            result['pdf'] = build_notes_mode(tex_file, mode, on_line=log.write)
+            if result['pdf'] is None:
+                result['error'] = f"pdflatex failed in {mode} mode (see {log_path})"
+        except Exception as e:
+            result['error'] = f"Error compiling {mode} mode: {str(e)}"
+    result['log'] = log_path
+    result['seconds'] = round(time.perf_counter() - started, 3)
+    if BSG_trace.is_enabled():
+        result['trace'] = BSG_trace.take_events()
+    return result
+
+
+def _new_summary(deck: str) -> dict:
+    return {'deck': deck, 'status': 'running', 'tex': None,
+            'processed': 0, 'failed': 0, 'errors': [], 'missing_media': [],
+            'pdfs': {}, 'logs': {},
+            'timings': {'convert': None, 'compile': {}, 'total': None},
+            '_started': time.perf_counter(), '_pending': 0}
+
+
+def _finish(summary: dict) -> dict:
+    summary['status'] = 'failed' if summary['errors'] else 'ok'
+    summary['timings']['total'] = round(time.perf_counter() - summary.pop('_started'), 3)
+    summary.pop('_pending')
+    try:
+        with open(os.path.join(build_root(summary['deck']), SUMMARY_FILE), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    except OSError as e:
+        print(f"Warning: Could not write build summary: {str(e)}", file=sys.stderr)
+    return summary
+
+
+def build(decks, jobs: int = None, modes=NOTES_MODES, no_network: bool = False,
+          compile_pdf: bool = True, use_cache: bool = True, on_summary=None) -> list:
+    """
+    Convert and compile decks in a process pool of `jobs` workers.
+    on_summary(summary) is called as each deck finishes. Returns all summaries
+    in the order of decks. While tracing is enabled, the workers' trace
+    events are merged into this process.
+    """
+    summaries = {deck: _new_summary(deck) for deck in decks}
+    trace = BSG_trace.is_enabled()
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count() or 1, initializer=_init_worker,
+                             initargs=(no_network, trace)) as executor:
+        pending = {executor.submit(convert_deck, deck, use_cache): (deck, 'convert') for deck in decks}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                deck, stage = pending.pop(future)
+                summary = summaries[deck]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker itself died (e.g. it ran out of memory)
+                    error = f"{stage} worker failed: {str(e)}"
+                    result = {'errors': [error], 'error': error}
+                BSG_trace.add_events(result.pop('trace', ()))
+
+                if stage == 'convert':
+                    summary.update(tex=result.get('tex'), processed=result.get('processed', 0),
+                                   failed=result.get('failed', 0))
+                    summary['errors'].extend(result.get('errors', []))
+                    summary['missing_media'] = result.get('missing_media', [])
+                    summary['logs']['convert'] = result.get('log')
+                    summary['timings']['convert'] = result.get('seconds')
+                    if compile_pdf and not summary['errors']:
+                        for mode in modes:
+                            pending[executor.submit(compile_deck, deck, summary['tex'], mode)] = (deck, mode)
+                            summary['_pending'] += 1
+                else:
+                    summary['_pending'] -= 1
+                    summary['pdfs'][stage] = result.get('pdf')
+                    summary['logs'][stage] = result.get('log')
+                    summary['timings']['compile'][stage] = result.get('seconds')
+                    if result.get('error'):
+                        summary['errors'].append(result['error'])
+
+                if summary['_pending'] == 0:
+                    _finish(summary)
+                    if on_summary:
+                        on_summary(summary)
+
+    return [summaries[deck] for deck in decks]
+
+
+def build_command(args) -> int:
+    decks = find_decks(args.paths)
+    if not decks:
+        print("No decks found", file=sys.stderr)
+        return 1
+
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = [mode for mode in modes if mode not in NOTES_MODES]
+    if unknown:
+        print(f"Unknown notes mode(s): {', '.join(unknown)} (choose from {', '.join(NOTES_MODES)})",
+              file=sys.stderr)
+        return 2
+
+    jobs = args.jobs or os.cpu_count() or 1
+    if args.trace:
+        BSG_trace.enable(args.trace)
+    print(f"Building {len(decks)} deck(s) with {jobs} job(s)"
+          f"{' (no network)' if args.no_network else ''}", file=sys.stderr)
+
+    summary_file = open(args.summary, 'w', encoding='utf-8') if args.summary else None
+
+    def report(summary):
+        line = json.dumps(summary)
+        print(line, flush=True)
+        if summary_file:
+            summary_file.write(line + "\n")
+        mark = "✓" if summary['status'] == 'ok' else "✗"
+        print(f"{mark} {summary['deck']} ({summary['timings']['total']:.1f}s)", file=sys.stderr)
+        for error in summary['errors']:
+            print(f"    {error}", file=sys.stderr)
+
+    try:
+        summaries = build(decks, jobs, modes, args.no_network, not args.no_compile,
+                          not args.no_cache, on_summary=report)
+    finally:
+        if summary_file:
+            summary_file.close()
+
+    failed = [s for s in summaries if s['status'] != 'ok']
+    print(f"{len(summaries) - len(failed)} built, {len(failed)} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='bsg', description='Beamer Slide Generator command line tools')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help='convert and compile decks without the IDE')
+    build_parser.add_argument('paths', nargs='+', help='deck files or directories to search for decks')
+    build_parser.add_argument('-j', '--jobs', type=int, default=None,
+                              help='parallel worker processes (default: all cores)')
+    build_parser.add_argument('--no-network', action='store_true',
+                              help='use cached remote media only; never download')
+    build_parser.add_argument('--modes', default=','.join(NOTES_MODES),
+                              help='comma separated notes modes to compile (default: %(default)s)')
+    build_parser.add_argument('--no-compile', action='store_true', help='only convert to TeX')
+    build_parser.add_argument('--no-cache', action='store_true', help='regenerate every frame')
+    build_parser.add_argument('--summary', help='also write the JSON Lines summaries to this file')
+    build_parser.add_argument('--trace', metavar='FILE',
+                              help='record a Chrome trace of every stage to FILE (also: BSG_TRACE=FILE)')
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        sys.exit(build_command(args))
+
+
+if __name__ == "__main__":
+    main()
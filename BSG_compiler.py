@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+"""
+BSG_compiler.py
+LaTeX compilation helpers shared by BSG-IDE and the command line tools.
+
+Nothing in this module touches Tk. The IDE runs compilations in a
+CompileWorker thread and drains its line queue from an after() poller.
+"""
+import os
+import re
+import time
+import queue
+import shutil
+import hashlib
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from BSG_trace import span
+
+# Auxiliary outputs whose contents feed back into the next pass
+AUX_EXTENSIONS = ('.aux', '.nav', '.toc', '.snm', '.out')
+RERUN_PATTERN = re.compile(r'Rerun to get|Rerun LaTeX|Label\(s\) may have changed|Please rerun')
+# pdflatex messages when a -fmt format cannot be loaded
+FORMAT_ERROR_PATTERN = re.compile(r"I can't find the format file|Fatal format file error|^---! .*\.fmt", re.M)
+MAX_PASSES = 4
+NOTES_MODES = ('slides', 'notes', 'both')
+BUILD_DIR_NAME = '.bsg-build'
+BUILD_STAMP = '.preamble-hash'
+PREVIEW_MODE = 'preview'
+# Set BSG_PRECOMPILED_PREAMBLE=0 to always typeset the preamble from source
+FORMAT_ENV = 'BSG_PRECOMPILED_PREAMBLE'
+
+
+def latex_line_color(line: str) -> str:
+    """Terminal color for a line of pdflatex output"""
+    if any(err in line for err in ['Error:', '!', 'Fatal error']):
+        return "red"
+    if 'Warning' in line:
+        return "yellow"
+    return "white"
+
+
+def run_pdflatex_pass(tex_file: str, cwd: str = None, on_line=None, cancel_event=None,
+                      on_process=None, extra_args=(), env=None) -> int:
+    """
+    Run a single pdflatex pass in cwd (defaults to the directory of tex_file)
+    without changing the process working directory.
+    Returns the pdflatex exit code, or -1 if the pass was cancelled.
+    """
+    tex_file = os.path.abspath(tex_file)
+    cwd = cwd or os.path.dirname(tex_file)
+    command = ['pdflatex', '-interaction=nonstopmode', *extra_args, os.path.relpath(tex_file, cwd)]
+
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors='replace',
+        bufsize=1
+    )
+    if on_process:
+        on_process(process)
+
+    try:
+        for line in process.stdout:
+            if on_line:
+                on_line(line)
+            if cancel_event is not None and cancel_event.is_set():
+                process.terminate()
+                break
+        return_code = process.wait()
+        if cancel_event is not None and cancel_event.is_set():
+            return -1
+        return return_code
+    finally:
+        process.stdout.close()
+        if on_process:
+            on_process(None)
+
+
+def aux_fingerprint(tex_file: str, out_dir: str = None) -> dict:
+    """Hash the auxiliary files pdflatex wrote for tex_file"""
+    out_dir = out_dir or os.path.dirname(os.path.abspath(tex_file))
+    jobname = os.path.splitext(os.path.basename(tex_file))[0]
+    fingerprint = {}
+    for ext in AUX_EXTENSIONS:
+        try:
+            with open(os.path.join(out_dir, jobname + ext), 'rb') as f:
+                fingerprint[ext] = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            continue
+    return fingerprint
+
+
+def output_stamp(tex_file: str, out_dir: str = None):
+    """(mtime_ns, size) of the PDF pdflatex writes for tex_file, or None if there is none"""
+    out_dir = out_dir or os.path.dirname(os.path.abspath(tex_file))
+    pdf = os.path.join(out_dir, os.path.splitext(os.path.basename(tex_file))[0] + '.pdf')
+    try:
+        stat = os.stat(pdf)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def log_requests_rerun(tex_file: str, out_dir: str = None) -> bool:
+    """True if the pdflatex log asks for another run"""
+    out_dir = out_dir or os.path.dirname(os.path.abspath(tex_file))
+    log_file = os.path.join(out_dir, os.path.splitext(os.path.basename(tex_file))[0] + '.log')
+    try:
+        with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+            return bool(RERUN_PATTERN.search(f.read()))
+    except OSError:
+        return False
+
+
+def run_pdflatex_passes(tex_file: str, cwd: str = None, max_passes: int = MAX_PASSES,
+                        on_pass=None, **pass_options) -> bool:
+    """
+    Run pdflatex until its auxiliary outputs reach a fixed point.
+
+    A further pass is only scheduled when a pass changed .aux/.nav/.toc/.snm/.out
+    or the log asks to rerun, so a content-only edit on an up-to-date build
+    needs a single pass. on_pass(number, seconds, reason) is called after every
+    pass; reason is None once the output is stable.
+
+    Under nonstopmode a recoverable error (a missing figure, say) exits
+    non-zero but still writes a PDF, so the exit code is not used: a pass
+    fails only when it wrote no fresh PDF or was cancelled. Returns False
+    in that case. Extra keyword arguments are passed on to run_pdflatex_pass.
+    """
+    cwd = cwd or os.path.dirname(os.path.abspath(tex_file))
+    cancel_event = pass_options.get('cancel_event')
+
+    for number in range(1, max_passes + 1):
+        before = aux_fingerprint(tex_file, cwd)
+        pdf_before = output_stamp(tex_file, cwd)
+        started = time.perf_counter()
+        with span('pdflatex pass', number=number, tex=os.path.basename(tex_file)):
+            run_pdflatex_pass(tex_file, cwd, **pass_options)
+        elapsed = time.perf_counter() - started
+
+        pdf_after = output_stamp(tex_file, cwd)
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        if cancelled or pdf_after is None or pdf_after == pdf_before:
+            if on_pass:
+                on_pass(number, elapsed, None)
+            return False
+
+        after = aux_fingerprint(tex_file, cwd)
+        changed = [ext for ext in after if before.get(ext) != after[ext]]
+        if log_requests_rerun(tex_file, cwd):
+            reason = "log requests a rerun"
+        elif changed:
+            reason = '/'.join(changed) + " changed"
+        else:
+            reason = None
+
+        if on_pass:
+            on_pass(number, elapsed, reason)
+        if reason is None:
+            return True
+
+    return True
+
+
+def modify_preamble_for_notes_mode(tex_content: str, mode: str) -> str:
+    """
+    Modify preamble based on notes mode while preserving original content.
+
+    Args:
+        tex_content: Original TEX content
+        mode: 'slides', 'notes', or 'both'
+    Returns:
+        Modified TEX content
+    """
+    # First find document begin position
+    doc_pos = tex_content.find("\\begin{document}")
+    if doc_pos == -1:
+        return tex_content
+
+    # Split content into preamble and document
+    preamble = tex_content[:doc_pos]
+    document = tex_content[doc_pos:]
+
+    # Define notes configurations
+    notes_configs = {
+        "slides": "\\setbeameroption{hide notes}",
+        "notes": "\\setbeameroption{show only notes}",
+        "both": "\\setbeameroption{show notes on second screen=right}"
+    }
+
+    # Remove any existing notes configurations
+    preamble = re.sub(r'\\setbeameroption{[^}]*}', '', preamble)
+
+    # Ensure pgfpages package
+    if "\\usepackage{pgfpages}" not in preamble:
+        preamble = preamble.rstrip() + "\n\\usepackage{pgfpages}\n"
+
+    # Add appropriate notes configuration
+    notes_config = notes_configs.get(mode, notes_configs['both'])
+    preamble = preamble.rstrip() + f"\n\n% Notes configuration\n{notes_config}\n"
+
+    # Add template style
+    preamble += "\\setbeamertemplate{note page}{\\pagecolor{yellow!5}\\insertnote}\n"
+
+    return preamble + document
+
+
+def share_media(source_dir: str, build_dir: str) -> dict:
+    """
+    Make source_dir's media visible to pdflatex runs in build_dir without
+    copying it. media_files is symlinked where the platform allows it, and
+    TEXINPUTS always lists source_dir so relative \\includegraphics paths
+    resolve either way. Returns the environment for the pdflatex processes.
+    """
+    media_dir = os.path.join(source_dir, 'media_files')
+    link = os.path.join(build_dir, 'media_files')
+    if os.path.isdir(media_dir) and not os.path.lexists(link):
+        try:
+            os.symlink(os.path.abspath(media_dir), link, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            pass  # e.g. Windows without symlink privilege; TEXINPUTS covers it
+
+    env = os.environ.copy()
+    # The trailing separator keeps the default TeX search path
+    env['TEXINPUTS'] = os.pathsep.join([os.path.abspath(source_dir), env.get('TEXINPUTS', '')]).rstrip(os.pathsep) + os.pathsep
+    return env
+
+
+def preamble_hash(tex_content: str) -> str:
+    """Hash of everything before \\begin{document}"""
+    doc_pos = tex_content.find("\\begin{document}")
+    preamble = tex_content if doc_pos == -1 else tex_content[:doc_pos]
+    return hashlib.sha1(preamble.encode('utf-8')).hexdigest()
+
+
+def build_root(input_file: str) -> str:
+    """Persistent build directory of a deck: <deck dir>/.bsg-build/<deck name>"""
+    source_dir = os.path.dirname(os.path.abspath(input_file))
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+    return os.path.join(source_dir, BUILD_DIR_NAME, base_name)
+
+
+def clean_build_dir(input_file: str, mode: str = None) -> None:
+    """Remove the persistent build files of one mode, or of the whole deck"""
+    root = build_root(input_file)
+    shutil.rmtree(os.path.join(root, mode) if mode else root, ignore_errors=True)
+
+
+def prepare_build_dir(input_file: str, mode: str, tex_content: str, clean: bool = False) -> str:
+    """
+    Return the persistent build directory for input_file in mode.
+
+    Auxiliary files are kept between runs so warm rebuilds converge in one
+    pass. The directory is emptied when clean is set or when the preamble of
+    tex_content differs from the one it was last built with.
+    """
+    build_dir = os.path.join(build_root(input_file), mode)
+    stamp_file = os.path.join(build_dir, BUILD_STAMP)
+    current = preamble_hash(tex_content)
+
+    try:
+        with open(stamp_file, 'r', encoding='utf-8') as f:
+            previous = f.read().strip()
+    except OSError:
+        previous = None
+
+    if clean or previous != current:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        os.makedirs(build_dir, exist_ok=True)
+        with open(stamp_file, 'w', encoding='utf-8') as f:
+            f.write(current)
+    return build_dir
+
+
+def discard_aux_files(tex_file: str, out_dir: str = None) -> None:
+    """Delete a job's auxiliary files so a broken run cannot poison the next one"""
+    out_dir = out_dir or os.path.dirname(os.path.abspath(tex_file))
+    jobname = os.path.splitext(os.path.basename(tex_file))[0]
+    for ext in AUX_EXTENSIONS:
+        try:
+            os.unlink(os.path.join(out_dir, jobname + ext))
+        except OSError:
+            pass
+
+
+def precompiled_format_enabled() -> bool:
+    return os.environ.get(FORMAT_ENV, '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def ensure_preamble_format(job_tex: str, build_dir: str, tex_content: str,
+                           env: dict = None, on_process=None) -> str:
+    """
+    Dump the preamble of job_tex into a mylatexformat format in build_dir.
+
+    The format is named after the preamble hash, so it is rebuilt whenever
+    the preamble changes. Returns the format name for pdflatex -fmt, or None
+    if no usable format exists (mylatexformat missing, dump failed, or the
+    format was found not to work with this preamble).
+    """
+    name = f"preamble-{preamble_hash(tex_content)[:12]}"
+    fmt_file = os.path.join(build_dir, name + '.fmt')
+    if os.path.exists(fmt_file + '.failed'):
+        return None
+    if os.path.exists(fmt_file):
+        return name
+
+    command = ['pdflatex', '-ini', '-interaction=nonstopmode', f'-jobname={name}',
+               '&pdflatex', 'mylatexformat.ltx', os.path.basename(job_tex)]
+    try:
+        process = subprocess.Popen(command, cwd=build_dir, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if on_process:
+            on_process(process)
+        return_code = process.wait()
+    except OSError:
+        return_code = -1
+    finally:
+        if on_process:
+            on_process(None)
+
+    if return_code == 0 and os.path.exists(fmt_file):
+        return name
+    reject_preamble_format(build_dir, name)
+    return None
+
+
+def reject_preamble_format(build_dir: str, name: str) -> None:
+    """Stop using a format for this preamble until the build dir is cleaned"""
+    fmt_file = os.path.join(build_dir, name + '.fmt')
+    try:
+        if os.path.exists(fmt_file):
+            os.unlink(fmt_file)
+        open(fmt_file + '.failed', 'w').close()
+    except OSError:
+        pass
+
+
+def compile_in_build_dir(job_tex: str, build_dir: str, tex_content: str, env: dict = None,
+                         max_passes: int = MAX_PASSES, on_line=None, on_pass=None,
+                         cancel_event=None, on_process=None) -> bool:
+    """
+    Compile job_tex (whose text is tex_content) inside a persistent build dir,
+    starting from the precompiled preamble format when one can be built.
+    The previous job PDF is removed first, so a run that dies before shipping
+    a page leaves no stale output behind. Aux files of failed (no PDF) or
+    cancelled runs are discarded. Returns success.
+    """
+    try:
+        os.unlink(os.path.splitext(job_tex)[0] + '.pdf')
+    except OSError:
+        pass
+
+    fmt = None
+    if precompiled_format_enabled():
+        fmt = ensure_preamble_format(job_tex, build_dir, tex_content, env, on_process)
+
+    format_errors = []
+
+    def watch_line(line):
+        if FORMAT_ERROR_PATTERN.search(line):
+            format_errors.append(line)
+        if on_line:
+            on_line(line)
+
+    pass_options = dict(on_pass=on_pass, cancel_event=cancel_event,
+                        on_process=on_process, env=env)
+    success = run_pdflatex_passes(job_tex, build_dir, max_passes, on_line=watch_line,
+                                  extra_args=(f'-fmt={fmt}',) if fmt else (), **pass_options)
+
+    cancelled = cancel_event is not None and cancel_event.is_set()
+    if fmt and not success and not cancelled and format_errors:
+        # The format itself could not be loaded; retry from source and only
+        # give up on the format if that run succeeds. Errors in the document
+        # body are not the format's fault and would fail the same way.
+        if on_line:
+            on_line("Precompiled preamble failed, retrying without it\n")
+        discard_aux_files(job_tex, build_dir)
+        success = run_pdflatex_passes(job_tex, build_dir, max_passes, on_line=on_line, **pass_options)
+        if success:
+            reject_preamble_format(build_dir, fmt)
+        cancelled = cancel_event is not None and cancel_event.is_set()
+
+    if cancelled or not success:
+        discard_aux_files(job_tex, build_dir)
+    return success and not cancelled
+
+
+def build_notes_mode(input_file: str, mode: str, build_dir: str = None, env: dict = None,
+                     on_line=None, on_pass=None, cancel_event=None, on_process=None,
+                     clean: bool = False) -> str:
+    """
+    Compile input_file in the given notes mode and copy the result next to
+    input_file as <name>_<mode>.pdf. Returns that path, or None if pdflatex
+    failed or was cancelled.
+
+    build_dir defaults to the persistent .bsg-build/<deck>/<mode> directory
+    (see prepare_build_dir); clean forces a cold build there. Passes start
+    from a precompiled preamble format when one can be built.
+    """
+    source_dir = os.path.dirname(os.path.abspath(input_file))
+    base_name = os.path.splitext(os.path.basename(input_file))[0]
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        content = modify_preamble_for_notes_mode(f.read(), mode)
+
+    if build_dir is None:
+        build_dir = prepare_build_dir(input_file, mode, content, clean)
+    job_tex = os.path.join(build_dir, f"{base_name}_{mode}.tex")
+    with open(job_tex, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    if env is None:
+        env = share_media(source_dir, build_dir)
+
+    if not compile_in_build_dir(job_tex, build_dir, content, env, on_line=on_line, on_pass=on_pass,
+                                cancel_event=cancel_event, on_process=on_process):
+        return None
+
+    output_pdf = os.path.splitext(job_tex)[0] + '.pdf'
+    if not os.path.exists(output_pdf):
+        return None
+    final_pdf = os.path.join(source_dir, f"{base_name}_{mode}.pdf")
+    shutil.copy2(output_pdf, final_pdf)
+    return final_pdf
+
+
+def build_frame_preview(deck_file: str, preamble: str, frame_latex: str,
+                        on_line=None, cancel_event=None, on_process=None) -> str:
+    """
+    Compile a single frame with the deck's preamble in .bsg-build/<deck>/preview.
+
+    preamble is everything up to and including \\begin{document}. Notes are
+    hidden and only one pass is run, so with the precompiled preamble format
+    a preview costs little more than typesetting the frame itself.
+    Returns the preview PDF path, or None on failure.
+    """
+    content = modify_preamble_for_notes_mode(
+        preamble.rstrip() + "\n\n" + frame_latex.strip() + "\n\n\\end{document}\n", 'slides')
+    build_dir = prepare_build_dir(deck_file, PREVIEW_MODE, content)
+    job_tex = os.path.join(build_dir, 'preview.tex')
+    with open(job_tex, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+    env = share_media(os.path.dirname(os.path.abspath(deck_file)), build_dir)
+    if not compile_in_build_dir(job_tex, build_dir, content, env, max_passes=1, on_line=on_line,
+                                cancel_event=cancel_event, on_process=on_process):
+        return None
+
+    pdf = os.path.join(build_dir, 'preview.pdf')
+    return pdf if os.path.exists(pdf) else None
+
+
+def build_all_modes(input_file: str, modes=NOTES_MODES, on_line=None, on_pass=None,
+                    on_result=None, cancel_event=None, on_process=None,
+                    clean: bool = False) -> dict:
+    """
+    Build every notes mode of an already converted TEX file concurrently.
+
+    Each mode gets its own pdflatex process running in its persistent build
+    directory, which shares the source media through share_media(), so
+    nothing is copied. on_line(mode, line) and on_pass(mode, number, seconds,
+    reason) report progress; on_result(mode, pdf_or_None, seconds) fires as
+    each mode finishes. Returns {mode: pdf path or None}.
+    """
+    results = {}
+
+    def build(mode):
+        started = time.perf_counter()
+        pdf = build_notes_mode(
+            input_file, mode,
+            on_line=(lambda line: on_line(mode, line)) if on_line else None,
+            on_pass=(lambda *info: on_pass(mode, *info)) if on_pass else None,
+            cancel_event=cancel_event,
+            on_process=on_process,
+            clean=clean
+        )
+        return mode, pdf, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=len(modes), thread_name_prefix='bsg-mode') as executor:
+        futures = [executor.submit(build, mode) for mode in modes]
+        for future in as_completed(futures):
+            mode, pdf, seconds = future.result()
+            results[mode] = pdf
+            if on_result:
+                on_result(mode, pdf, seconds)
+    return results
+
+
+class CompileWorker:
+    """
+    Runs a compilation job in a background thread.
+
+    job is called as job(worker) and may use worker.run_pass() and
+    worker.emit(); its return value becomes worker.result. Output lines are
+    queued as (text, color) tuples for the UI thread to drain. Converter
+    events passed to worker.post_event are queued the same way.
+    """
+
+    def __init__(self, job, name: str = "bsg-compile"):
+        self.job = job
+        self.lines = queue.Queue()
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.process = None
+        self.processes = set()
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> 'CompileWorker':
+        self.thread.start()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self.job(self)
+        except Exception as e:
+            self.error = e
+
+    def _set_process(self, process):
+        self.process = process
+
+    def _track_process(self, process):
+        """on_process hook for jobs running several pdflatex passes at once"""
+        if process is not None:
+            self.processes.add(process)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def is_running(self) -> bool:
+        return self.thread.is_alive()
+
+    def emit(self, text: str, color: str = None) -> None:
+        """Queue text for the terminal"""
+        self.lines.put((text, color or latex_line_color(text)))
+
+    def post_event(self, action: str, data: dict) -> None:
+        """on_event callback for the converter; the UI thread drains these with drain_events()"""
+        self.events.put((action, data))
+
+    def drain_events(self) -> list:
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def run_pass(self, tex_file: str, cwd: str = None, extra_args=(), env=None) -> bool:
+        """Run one pdflatex pass, streaming its log through the queue"""
+        if self.cancelled:
+            return False
+        return_code = run_pdflatex_pass(
+            tex_file, cwd,
+            on_line=self.emit,
+            cancel_event=self.cancel_event,
+            on_process=self._set_process,
+            extra_args=extra_args,
+            env=env
+        )
+        return return_code == 0
+
+    def _pass_reporter(self, timings: list):
+        """on_pass callback that prints per-pass timings and collects them"""
+        def report(number, seconds, reason):
+            timings.append(seconds)
+            if reason:
+                self.emit(f"\nPass {number}: {seconds:.2f}s ({reason}, running again)\n", "white")
+            else:
+                self.emit(f"\nPass {number}: {seconds:.2f}s\n", "white")
+        return report
+
+    def _report_total(self, timings: list) -> None:
+        self.emit(f"Output stable after {len(timings)} pass(es), "
+                  f"{sum(timings):.2f}s total\n", "green")
+
+    def run_until_stable(self, tex_file: str, cwd: str = None, max_passes: int = MAX_PASSES,
+                         extra_args=(), env=None) -> bool:
+        """Run as many pdflatex passes as needed, reporting per-pass timings"""
+        if self.cancelled:
+            return False
+        timings = []
+        success = run_pdflatex_passes(
+            tex_file, cwd, max_passes,
+            on_pass=self._pass_reporter(timings),
+            on_line=self.emit,
+            cancel_event=self.cancel_event,
+            on_process=self._set_process,
+            extra_args=extra_args,
+            env=env
+        )
+        if success:
+            self._report_total(timings)
+        return success
+
+    def build_notes_mode(self, input_file: str, mode: str, build_dir: str = None,
+                         clean: bool = False) -> str:
+        """Run build_notes_mode() with its log streamed to the terminal queue"""
+        if self.cancelled:
+            return None
+        timings = []
+        pdf = build_notes_mode(
+            input_file, mode, build_dir,
+            clean=clean,
+            on_line=self.emit,
+            on_pass=self._pass_reporter(timings),
+            cancel_event=self.cancel_event,
+            on_process=self._set_process
+        )
+        if pdf:
+            self._report_total(timings)
+        return pdf
+
+    def build_frame_preview(self, deck_file: str, preamble: str, frame_latex: str) -> str:
+        """Run build_frame_preview(), forwarding only error lines to the terminal"""
+        if self.cancelled:
+            return None
+
+        def forward_line(line):
+            if latex_line_color(line) == "red":
+                self.emit(line, "red")
+
+        return build_frame_preview(deck_file, preamble, frame_latex,
+                                   on_line=forward_line, cancel_event=self.cancel_event,
+                                   on_process=self._set_process)
+
+    def build_all_modes(self, tex_file: str, modes=NOTES_MODES, clean: bool = False) -> dict:
+        """
+        Run build_all_modes() with progress routed to the terminal queue.
+        Only error lines are forwarded since the concurrent logs interleave;
+        the full logs stay in each mode's .log file.
+        """
+        def forward_line(mode, line):
+            if latex_line_color(line) == "red":
+                self.emit(f"[{mode}] {line}", "red")
+
+        def report_pass(mode, number, seconds, reason):
+            suffix = f" ({reason}, running again)" if reason else ""
+            self.emit(f"[{mode}] pass {number}: {seconds:.2f}s{suffix}\n", "white")
+
+        def report_result(mode, pdf, seconds):
+            if pdf:
+                self.emit(f"[{mode}] ✓ {os.path.basename(pdf)} in {seconds:.2f}s\n", "green")
+            else:
+                self.emit(f"[{mode}] ✗ failed after {seconds:.2f}s\n", "red")
+
+        return build_all_modes(tex_file, modes,
+                               on_line=forward_line, on_pass=report_pass,
+                               on_result=report_result, cancel_event=self.cancel_event,
+                               on_process=self._track_process, clean=clean)
+
+    def cancel(self) -> None:
+        """Stop the job; the running pdflatex process is terminated"""
+        self.cancel_event.set()
+        for process in {self.process, *self.processes}:
+            if process and process.poll() is None:
+                try:
+                    process.terminate()
+                except OSError:
+                    pass
+
+    def drain(self, limit: int = 500) -> list:
+        """
+        Take up to limit queued lines, merging consecutive lines of the same
+        color so the terminal is updated once per run instead of once per line.
+        """
+        batches = []
+        for _ in range(limit):
+            try:
+                text, color = self.lines.get_nowait()
+            except queue.Empty:
+                break
+            if batches and batches[-1][1] == color:
+                batches[-1][0].append(text)
+            else:
+                batches.append(([text], color))
+        return [(''.join(texts), color) for texts, color in batches]
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+BSG_environment.py
+Cached verification of BSG-IDE's Python dependencies.
+
+A stamp in ~/.bsg-ide/environment.json records which requirements were
+importable for a given requirements.txt and interpreter. While the stamp
+matches, startup does no pip or network work at all. Only the standard
+library is used here so the check can run before any GUI import.
+"""
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from importlib import util
+
+STAMP_FILE = Path.home() / '.bsg-ide' / 'environment.json'
+STAMP_VERSION = 1
+REPAIR_INTERVAL = 24 * 60 * 60      # retry a failed background repair once a day
+
+# Packages the IDE cannot start without
+BASE_MODULES = ('customtkinter', 'PIL', 'tkinter')
+
+# requirements.txt name -> import name, where they differ
+REQUIREMENT_MODULES = {
+    'pillow': 'PIL',
+    'tk': 'tkinter',
+    'pymupdf': 'fitz',
+    'python-poppler': 'poppler',
+    'opencv-python': 'cv2',
+    'yt-dlp': 'yt_dlp',
+    'pywin32': 'win32api',
+    'pycairo': 'cairo',
+    'pygobject': 'gi',
+    'typing-extensions': 'typing_extensions',
+    'pyenchant': 'enchant',
+    'python-magic': 'magic',
+    'python-magic-bin': 'magic',
+    'pyspellchecker': 'spellchecker',
+}
+
+
+def _marker_applies(marker: str) -> bool:
+    """Evaluate an environment marker; unknown markers count as applicable"""
+    # platform_system comparisons are handled here to avoid importing packaging
+    simple = re.fullmatch(r'\s*platform_system\s*(==|!=)\s*["\']([^"\']*)["\']\s*', marker)
+    if simple:
+        return (platform.system() == simple.group(2)) == (simple.group(1) == '==')
+    try:
+        from packaging.markers import Marker
+        return Marker(marker).evaluate()
+    except Exception:
+        return True
+
+
+def requirement_modules(requirements_path) -> list:
+    """(requirement spec, import name) for each requirement that applies here"""
+    modules = []
+    with open(requirements_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            spec = line.split('#', 1)[0].strip()
+            if not spec:
+                continue
+            if ';' in spec:
+                spec, marker = (part.strip() for part in spec.split(';', 1))
+                if not _marker_applies(marker):
+                    continue
+            name = spec
+            for separator in ('==', '>=', '<=', '~=', '!=', '>', '<', '['):
+                name = name.split(separator, 1)[0]
+            name = name.strip().lower()
+            modules.append((spec, REQUIREMENT_MODULES.get(name, name.replace('-', '_'))))
+    return modules
+
+
+def environment_key(requirements_path) -> str:
+    """Hash of requirements.txt and the running interpreter"""
+    digest = hashlib.sha256()
+    if requirements_path and os.path.exists(requirements_path):
+        with open(requirements_path, 'rb') as f:
+            digest.update(f.read())
+    digest.update(f"\0{sys.executable}\0{sys.version}\0{platform.platform()}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def read_stamp() -> dict:
+    try:
+        with open(STAMP_FILE, 'r', encoding='utf-8') as f:
+            stamp = json.load(f)
+        if stamp.get('version') == STAMP_VERSION:
+            return stamp
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def write_stamp(**fields) -> None:
+    """Merge fields into the stamp and write it atomically"""
+    stamp = read_stamp()
+    stamp.update(fields, version=STAMP_VERSION)
+    try:
+        STAMP_FILE.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=STAMP_FILE.parent, suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(stamp, f)
+        os.replace(temp_path, STAMP_FILE)
+    except OSError as e:
+        print(f"Warning: Could not write environment stamp: {str(e)}")
+
+
+def module_found(module: str) -> bool:
+    """Whether module can be imported; nothing is executed"""
+    try:
+        return util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def missing_requirements(requirements_path) -> list:
+    """(spec, module) pairs whose module cannot be found. No imports are executed"""
+    return [(spec, module) for spec, module in requirement_modules(requirements_path)
+            if not module_found(module)]
+
+
+def check_environment(requirements_path, force: bool = False) -> list:
+    """
+    Return the missing requirements as (spec, module) pairs. When the stamp
+    matches, only the modules it lists as missing are looked up again (so a
+    package installed by hand is noticed); otherwise every requirement is
+    checked. The stamp is rewritten whenever the result changes.
+    """
+    key = environment_key(requirements_path)
+    stamp = read_stamp()
+    if not force and stamp.get('key') == key:
+        recorded = [tuple(item) for item in stamp.get('missing', [])]
+        missing = [(spec, module) for spec, module in recorded if not module_found(module)]
+        if missing != recorded:
+            write_stamp(missing=missing)
+        return missing
+    if not requirements_path or not os.path.exists(requirements_path):
+        return [(module, module) for module in BASE_MODULES if not module_found(module)]
+
+    missing = missing_requirements(requirements_path)
+    write_stamp(key=key, verified=time.time(), missing=missing)
+    return missing
+
+
+def missing_base_modules(missing) -> list:
+    return [module for _, module in missing if module in BASE_MODULES]
+
+
+def repair_due() -> bool:
+    """Whether a background repair may run (at most once per REPAIR_INTERVAL)"""
+    return time.time() - read_stamp().get('repair_attempted', 0) > REPAIR_INTERVAL
+
+
+def repair(missing, python: str = None) -> tuple:
+    """
+    pip-install the missing requirement specs into the running interpreter.
+    Returns (installed, failed) spec lists. Output is not printed so this
+    can run on a background thread.
+    """
+    write_stamp(repair_attempted=time.time())
+    installed, failed = [], []
+    for spec, _ in missing:
+        result = subprocess.run(
+            [python or sys.executable, "-m", "pip", "install", spec],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        (installed if result.returncode == 0 else failed).append(spec)
+    return installed, failed
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+BSG_fetch.py
+Shared HTTP fetcher for all remote media I/O in BeamerSlideGenerator.
+
+One requests.Session with a pooled adapter is reused for every request, so
+decks pulling many files from the same host keep their connections alive.
+Failed requests are retried with exponential backoff and each host gets a
+bounded number of concurrent transfers.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from BSG_lazy import lazy_import
+from BSG_trace import count
+
+# requests is only loaded when the first fetcher is created
+requests = lazy_import('requests')
+
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_POOL_SIZE = 16
+DEFAULT_PER_HOST = 4
+CHUNK_SIZE = 65536
+
+
+def _env_number(name, default, cast=int):
+    try:
+        return cast(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+
+class MediaFetcher:
+    """Pooled, retrying HTTP client with per-host concurrency limits"""
+
+    def __init__(self, connect_timeout=None, read_timeout=None, retries=None,
+                 backoff_factor=None, pool_size=None, per_host_limit=None):
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.timeout = (
+            connect_timeout if connect_timeout is not None
+            else _env_number('BSG_HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT, float),
+            read_timeout if read_timeout is not None
+            else _env_number('BSG_HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT, float)
+        )
+        retries = retries if retries is not None else _env_number('BSG_HTTP_RETRIES', DEFAULT_RETRIES)
+        backoff_factor = backoff_factor if backoff_factor is not None else DEFAULT_BACKOFF
+        pool_size = pool_size or DEFAULT_POOL_SIZE
+        self.per_host_limit = per_host_limit or _env_number('BSG_HTTP_PER_HOST', DEFAULT_PER_HOST)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'BSG-IDE media fetcher'
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+
+    def _host_slot(self, url):
+        """Semaphore limiting concurrent transfers to url's host"""
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    @contextmanager
+    def stream(self, url, headers=None, timeout=None):
+        """
+        Open a streaming GET. The host slot is held until the block exits,
+        so the body transfer counts against the per-host limit as well.
+        """
+        with self._host_slot(url):
+            response = self.session.get(url, stream=True, headers=headers,
+                                        timeout=timeout or self.timeout)
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def head(self, url, timeout=None):
+        """HEAD request through the shared session"""
+        with self._host_slot(url):
+            return self.session.head(url, timeout=timeout or self.timeout, allow_redirects=True)
+
+    @staticmethod
+    def iter_body(response, progress=None):
+        """
+        Yield the response body in chunks.
+        progress(bytes_done, bytes_total) is called after every chunk; total is 0 when unknown.
+        """
+        total = int(response.headers.get('content-length') or 0)
+        done = 0
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            if not chunk:
+                continue
+            done += len(chunk)
+            count('bytes_downloaded', len(chunk))
+            if progress:
+                progress(done, total)
+            yield chunk
+
+    def download(self, url, fileobj, headers=None, progress=None, timeout=None):
+        """Stream url into fileobj. Returns the (closed) response for its headers"""
+        with self.stream(url, headers=headers, timeout=timeout) as response:
+            response.raise_for_status()
+            for chunk in self.iter_body(response, progress):
+                fileobj.write(chunk)
+            return response
+
+    def close(self):
+        self.session.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher():
+    """Return the process-wide fetcher"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = MediaFetcher()
+        return _fetcher
+
+
+def configure_fetcher(**options):
+    """Replace the process-wide fetcher with one built from options"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is not None:
+            _fetcher.close()
+        _fetcher = MediaFetcher(**options)
+        return _fetcher
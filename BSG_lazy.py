@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+BSG_lazy.py
+Deferred imports for heavy or optional modules.
+
+lazy_import(name) returns a stand-in module that imports the real one on
+first attribute access, so `requests = lazy_import('requests')` at the top
+of a file costs nothing until a feature actually makes a request. Missing
+optional modules raise ImportError at that first use, not at startup.
+The first import is serialized, so the proxies are safe to share between
+the converter's worker threads.
+"""
+import sys
+import types
+import importlib
+import importlib.util
+import threading
+
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports its target when an attribute is first read"""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        # Later lookups of this attribute skip __getattr__
+        self.__dict__[attr] = value
+        return value
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__['_module'] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str):
+    """name itself if already imported, otherwise a LazyModule for it"""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+
+def is_available(name: str) -> bool:
+    """Whether name can be imported, without importing it"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+BSG_media_cache.py
+Persistent, content-addressed download cache for remote media.
+
+Downloaded bodies are stored once under ~/.bsg-ide/media_cache/files/<sha256 prefix><ext>
+and indexed by URL in ~/.bsg-ide/media_cache/index.json together with the
+ETag/Last-Modified validators and the converted outputs produced from them.
+"""
+import os
+import json
+import time
+import atexit
+import hashlib
+import tempfile
+import mimetypes
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+from BSG_lazy import lazy_import
+from BSG_fetch import MediaFetcher, get_fetcher
+from BSG_trace import count
+
+requests = lazy_import('requests')
+
+DEFAULT_CACHE_DIR = Path.home() / '.bsg-ide' / 'media_cache'
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024      # 2 GB
+DEFAULT_REVALIDATE_AFTER = 7 * 24 * 60 * 60     # one week
+INDEX_VERSION = 1
+
+
+class OfflineCacheMiss(Exception):
+    """Raised when offline mode is on and a URL has never been downloaded"""
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class MediaCache:
+    """URL -> local file cache with conditional revalidation and LRU eviction"""
+
+    def __init__(self, cache_dir=None, max_bytes=None, revalidate_after=None, offline=None):
+        self.cache_dir = Path(cache_dir or os.environ.get('BSG_MEDIA_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.files_dir = self.cache_dir / 'files'
+        self.index_file = self.cache_dir / 'index.json'
+
+        if max_bytes is None:
+            max_mb = os.environ.get('BSG_MEDIA_CACHE_MAX_MB')
+            max_bytes = int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.revalidate_after = DEFAULT_REVALIDATE_AFTER if revalidate_after is None else revalidate_after
+        self.offline = _env_flag('BSG_OFFLINE') if offline is None else offline
+
+        self.lock = threading.RLock()
+        self.entries = {}
+        self.dirty = False      # in-memory changes (last_used, validated) not yet on disk
+        try:
+            self.files_dir.mkdir(parents=True, exist_ok=True)
+            self.entries = self._read_index()
+        except OSError as e:
+            print(f"Warning: Media cache unavailable: {str(e)}")
+
+    # ------------------------------------------------------------------ index
+    def _read_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                return data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save_index(self):
+        """Merge with the on-disk index and write it back atomically"""
+        try:
+            merged = self._read_index()
+            merged.update(self.entries)
+            self.entries = merged
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.json')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'entries': self.entries}, f)
+            os.replace(temp_path, self.index_file)
+            self.dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write media cache index: {str(e)}")
+
+    def flush(self):
+        """Write pending last_used/validated updates to the index"""
+        with self.lock:
+            if self.dirty:
+                self._save_index()
+
+    def _blob_path(self, entry):
+        return self.files_dir / entry['blob']
+
+    def lookup(self, url):
+        """Return the index entry for url if its body is still on disk"""
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry and entry.get('blob') and self._blob_path(entry).exists():
+                return entry
+            return None
+
+    def _touch(self, url):
+        # Hits only update memory; the index is written by the next store or flush()
+        self.entries[url]['last_used'] = time.time()
+        self.dirty = True
+
+    # ------------------------------------------------------------------ fetch
+    def fetch(self, url, timeout=None, progress=None):
+        """
+        Return the local path of url's body, downloading it only when needed.
+        Fresh entries are served without touching the network; stale ones are
+        revalidated with If-None-Match/If-Modified-Since.
+        """
+        with self.lock:
+            entry = self.lookup(url)
+            if entry:
+                fresh = time.time() - entry.get('validated', 0) < self.revalidate_after
+                if fresh or self.offline:
+                    count('media_cache_hits')
+                    self._touch(url)
+                    return str(self._blob_path(entry))
+            elif self.offline:
+                raise OfflineCacheMiss(f"Offline mode: {url} is not in the media cache")
+
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            with get_fetcher().stream(url, headers=headers, timeout=timeout) as response:
+                if entry and response.status_code == 304:
+                    count('media_cache_revalidated')
+                    with self.lock:
+                        entry['validated'] = time.time()
+                        self._touch(url)
+                    return str(self._blob_path(entry))
+
+                response.raise_for_status()
+                count('media_cache_misses')
+                return self._store(url, response, progress)
+        except requests.exceptions.RequestException as e:
+            if entry:
+                print(f"Warning: Could not revalidate {url} ({str(e)}), using cached copy")
+                return str(self._blob_path(entry))
+            raise
+
+    def _store(self, url, response, progress=None):
+        """Stream a response body into the content-addressed store"""
+        content_type = response.headers.get('content-type', '').split(';')[0]
+        ext = mimetypes.guess_extension(content_type) or os.path.splitext(urlparse(url).path)[1] or '.tmp'
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.files_dir, suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in MediaFetcher.iter_body(response, progress):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            blob = digest.hexdigest()[:16] + ext
+            blob_path = self.files_dir / blob
+            if blob_path.exists():
+                os.unlink(temp_path)
+            else:
+                os.replace(temp_path, blob_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        now = time.time()
+        with self.lock:
+            # Keep earlier conversions when the body did not actually change
+            previous = self.entries.get(url) or {}
+            outputs = previous.get('outputs', {}) if previous.get('hash') == digest.hexdigest() else {}
+            self.entries[url] = {
+                'hash': digest.hexdigest(),
+                'blob': blob,
+                'size': size,
+                'content_type': content_type,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched': now,
+                'validated': now,
+                'last_used': now,
+                'outputs': outputs
+            }
+            self._save_index()
+            self.evict()
+        return str(blob_path)
+
+    # ---------------------------------------------------------------- outputs
+    def get_output(self, url, output_folder):
+        """Return (path, media_type) of a previous conversion of url into output_folder"""
+        with self.lock:
+            entry = self.entries.get(url)
+            if not entry:
+                return None
+            output = entry.get('outputs', {}).get(os.path.abspath(output_folder))
+            if output and output.get('hash') == entry.get('hash') and os.path.exists(output['path']):
+                self._touch(url)
+                return output['path'], output['media_type']
+            return None
+
+    def record_output(self, url, output_folder, path, media_type):
+        """Remember that url was converted to path inside output_folder"""
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                # Media not fetched through fetch() (e.g. YouTube) is tracked by output only
+                entry = self.entries[url] = {'hash': None, 'blob': None, 'size': 0,
+                                             'validated': time.time(), 'outputs': {}}
+            entry.setdefault('outputs', {})[os.path.abspath(output_folder)] = {
+                'path': os.path.abspath(path),
+                'media_type': media_type,
+                'hash': entry.get('hash')
+            }
+            entry['last_used'] = time.time()
+            self._save_index()
+
+    # --------------------------------------------------------------- eviction
+    def evict(self):
+        """Drop least recently used bodies until the store fits in max_bytes"""
+        with self.lock:
+            stored = [(url, e) for url, e in self.entries.items() if e.get('blob')]
+            total = sum(e.get('size', 0) for _, e in stored)
+            if total <= self.max_bytes:
+                return
+
+            stored.sort(key=lambda item: item[1].get('last_used', 0))
+            for url, entry in stored:
+                if total <= self.max_bytes:
+                    break
+                total -= entry.get('size', 0)
+                del self.entries[url]
+                still_used = any(e.get('blob') == entry['blob'] for e in self.entries.values())
+                if not still_used:
+                    try:
+                        os.unlink(self._blob_path(entry))
+                    except OSError:
+                        pass
+
+            # Write the pruned index directly; merging would resurrect evicted entries
+            try:
+                fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.json')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({'version': INDEX_VERSION, 'entries': self.entries}, f)
+                os.replace(temp_path, self.index_file)
+                self.dirty = False
+            except OSError as e:
+                print(f"Warning: Could not write media cache index: {str(e)}")
+
+
+_media_cache = None
+_media_cache_lock = threading.Lock()
+
+
+def get_media_cache():
+    """Return the process-wide media cache"""
+    global _media_cache
+    with _media_cache_lock:
+        if _media_cache is None:
+            _media_cache = MediaCache()
+            atexit.register(_media_cache.flush)
+        return _media_cache
+
+
+def flush_media_cache():
+    """Flush the process-wide cache's pending index updates, if it was ever used"""
+    if _media_cache is not None:
+        _media_cache.flush()
+
+
+def set_offline_mode(enabled=True):
+    """Serve remote media only from the cache; never touch the network"""
+    get_media_cache().offline = bool(enabled)
+
+
+def is_offline():
+    return get_media_cache().offline
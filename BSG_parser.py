@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+BSG_parser.py
+Streaming parser and slide model for the BSG presentation source format (.txt).
+
+    \\title Slide title
+    \\begin{Content} <media directive>
+    - content lines
+    \\end{Content}
+    \\begin{Notes}
+    speaker notes
+    \\end{Notes}
+
+DeckParser walks the file once, line by line, and yields one SlideRecord
+per slide. Everything before the first slide is kept as the header, which
+holds the preamble and \\key{value} metadata. The IDE loader, the converter
+and update_input_file all read decks through this module.
+
+Slide is the IDE's in-memory slide; it caches its serialized source text
+and content hash until one of its fields changes. write_deck saves slides
+incrementally: clean slides are copied byte for byte from the previous file.
+"""
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+from typing import NamedTuple, Optional, Tuple
+
+METADATA_PATTERN = re.compile(r'\\(\w+)\{(.*?)\}')
+SLIDE_SEPARATOR = b"\n\n"
+END_DOCUMENT = b"\\end{document}"
+
+
+class SlideRecord(NamedTuple):
+    """
+    One slide as written in the source. Lines are 1-based and inclusive;
+    bytes are UTF-8 offsets of the slide's first and one-past-last byte.
+    content_start/content_end are the lines of \\begin{Content} and
+    \\end{Content} (None when the slide has no Content block).
+    """
+    title: Optional[str]
+    media: Optional[str]
+    content: Tuple[str, ...]
+    notes: Tuple[str, ...]
+    start_line: int
+    end_line: int
+    start_byte: int
+    end_byte: int
+    content_start: Optional[int] = None
+    content_end: Optional[int] = None
+
+
+def is_slide_title(line: str) -> bool:
+    """\\title followed by whitespace starts a slide; \\title{...} is deck metadata"""
+    return line.startswith('\\title') and (len(line) == 6 or line[6].isspace())
+
+
+class DeckParser:
+    """
+    Iterate over a deck's slides in one pass.
+
+    source may be a path or any iterable of lines (an open file, a list).
+    After iteration, header_lines holds the lines before the first slide,
+    metadata the first \\key{value} of each key found in them, and
+    has_end_document whether \\end{document} was reached.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.header_lines = []
+        self.metadata = {}
+        self.has_end_document = False
+
+    def __iter__(self):
+        if isinstance(self.source, str):
+            with open(self.source, 'r', encoding='utf-8', newline='') as f:
+                yield from self._parse(f)
+        else:
+            yield from self._parse(self.source)
+
+    def _parse(self, lines):
+        slide = None
+        block = None            # 'content' or 'notes' while inside a block
+        in_header = True
+        byte_pos = 0
+
+        for line_no, raw in enumerate(lines, start=1):
+            line_start = byte_pos
+            byte_pos += len(raw.encode('utf-8'))
+            line = raw.strip()
+
+            if line.startswith('\\end{document}'):
+                self.has_end_document = True
+                break
+
+            if is_slide_title(line):
+                if slide and _has_data(slide):
+                    yield _record(slide)
+                in_header = False
+                block = None
+                slide = _new_slide(line[6:].strip(), line_no, line_start)
+                _extend(slide, line_no, byte_pos)
+                continue
+
+            if in_header:
+                if line.startswith('\\begin{Content}'):
+                    # A Content block before any \title still makes an (untitled) slide
+                    in_header = False
+                    slide = _new_slide(None, line_no, line_start)
+                else:
+                    self.header_lines.append(raw[:-2] + '\n' if raw.endswith('\r\n') else raw)
+                    for key, value in METADATA_PATTERN.findall(line):
+                        self.metadata.setdefault(key, value)
+                    continue
+
+            if line.startswith('\\begin{Content}'):
+                block = 'content'
+                slide['content_start'] = line_no
+                directive = line[len('\\begin{Content}'):].strip()
+                if directive:
+                    slide['media'] = directive
+            elif line.startswith('\\end{Content}'):
+                block = None
+                slide['content_end'] = line_no
+            elif line.startswith('\\begin{Notes}'):
+                block = 'notes'
+            elif line.startswith('\\end{Notes}'):
+                block = None
+            elif block == 'content':
+                if line:
+                    slide['content'].append(raw.rstrip('\r\n'))
+            elif block == 'notes':
+                if line:
+                    slide['notes'].append(line)
+            else:
+                # Text between blocks is not part of the slide
+                continue
+            _extend(slide, line_no, byte_pos)
+
+        if slide and _has_data(slide):
+            yield _record(slide)
+
+
+def _new_slide(title, line_no, byte_start):
+    return {'title': title, 'media': None, 'content': [], 'notes': [],
+            'start_line': line_no, 'end_line': line_no,
+            'start_byte': byte_start, 'end_byte': byte_start,
+            'content_start': None, 'content_end': None}
+
+
+def _extend(slide, line_no, byte_end):
+    slide['end_line'] = line_no
+    slide['end_byte'] = byte_end
+
+
+def _has_data(slide):
+    return (slide['title'] is not None or slide['media'] is not None
+            or bool(slide['content']) or bool(slide['notes']))
+
+
+def _record(slide):
+    return SlideRecord(
+        slide['title'], slide['media'], tuple(slide['content']), tuple(slide['notes']),
+        slide['start_line'], slide['end_line'], slide['start_byte'], slide['end_byte'],
+        slide['content_start'], slide['content_end']
+    )
+
+
+def parse_slides(source):
+    """Yield the SlideRecords of source (a path or an iterable of lines)"""
+    return iter(DeckParser(source))
+
+
+class Slide:
+    """
+    One slide in the editor.
+
+    Fields are immutable tuples/strings; assigning a different value marks
+    the slide dirty and drops the cached source text and hash. span is the
+    (start, end) byte range of the slide in the last file it was read from
+    or written to; it is only meaningful while the slide is clean.
+    """
+    __slots__ = ('_title', '_media', '_content', '_notes', 'dirty', 'span', '_hash', '_source')
+
+    def __init__(self, title: str = '', media: str = '', content=(), notes=()):
+        self._title = title
+        self._media = media
+        self._content = tuple(content)
+        self._notes = tuple(notes)
+        self.dirty = True
+        self.span = None
+        self._hash = None
+        self._source = None
+
+    @classmethod
+    def from_record(cls, record: SlideRecord) -> 'Slide':
+        slide = cls(record.title or '', record.media or '', record.content, record.notes)
+        slide.dirty = False
+        slide.span = (record.start_byte, record.end_byte)
+        return slide
+
+    def _set(self, name, value):
+        if getattr(self, name) != value:
+            setattr(self, name, value)
+            self.dirty = True
+            self._hash = None
+            self._source = None
+
+    @property
+    def title(self) -> str:
+        return self._title
+
+    @title.setter
+    def title(self, value: str):
+        self._set('_title', value)
+
+    @property
+    def media(self) -> str:
+        return self._media
+
+    @media.setter
+    def media(self, value: str):
+        self._set('_media', value)
+
+    @property
+    def content(self) -> tuple:
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._set('_content', tuple(value))
+
+    @property
+    def notes(self) -> tuple:
+        return self._notes
+
+    @notes.setter
+    def notes(self, value):
+        self._set('_notes', tuple(value))
+
+    def update(self, title: str, media: str, content, notes) -> bool:
+        """Set all fields at once. Returns True if anything changed"""
+        was_dirty, self.dirty = self.dirty, False
+        self.title = title
+        self.media = media
+        self.content = content
+        self.notes = notes
+        changed = self.dirty
+        self.dirty = was_dirty or changed
+        return changed
+
+    def copy(self, **changes) -> 'Slide':
+        """New (dirty) slide with the same fields, overridden by changes"""
+        fields = {'title': self._title, 'media': self._media,
+                  'content': self._content, 'notes': self._notes}
+        fields.update(changes)
+        return Slide(**fields)
+
+    @property
+    def hash(self) -> str:
+        """Content hash of the slide's fields"""
+        if self._hash is None:
+            self._hash = hashlib.sha1(self.to_source().encode('utf-8')).hexdigest()
+        return self._hash
+
+    def to_source(self) -> str:
+        """The slide in the .txt source format, from \\title to \\end{Notes}"""
+        if self._source is None:
+            parts = [f"\\title {self._title}\n", "\\begin{Content}"]
+            if self._media:
+                parts.append(f" {self._media}")
+            parts.append("\n")
+            parts.extend(f"{item}\n" for item in self._content if item.strip())
+            parts.append("\\end{Content}\n\n")
+            parts.append("\\begin{Notes}\n")
+            if self._notes:
+                parts.extend(f"{note}\n" for note in self._notes)
+            else:
+                parts.append("\n")
+            parts.append("\\end{Notes}\n")
+            self._source = ''.join(parts)
+        return self._source
+
+    def __repr__(self):
+        return f"Slide({self._title!r}, media={self._media!r}, dirty={self.dirty})"
+
+
+def serialize_deck(header: str, slides, source: bytes = b'') -> Tuple[bytes, list]:
+    """
+    Build the deck file from header and slides. Clean slides with a span are
+    copied from source (the previous file's bytes); the rest use their cached
+    to_source() text. Returns the file bytes and each slide's new span.
+    """
+    parts = [header.encode('utf-8')]
+    position = len(parts[0])
+    spans = []
+    for slide in slides:
+        if not slide.dirty and slide.span and slide.span[1] <= len(source):
+            chunk = source[slide.span[0]:slide.span[1]]
+            # The last slide of a file may lack its newline; \end{document}
+            # must still start a line or the deck loses it on reparse
+            if not chunk.endswith(b"\n"):
+                chunk += b"\n"
+        else:
+            chunk = slide.to_source().encode('utf-8')
+        position += len(SLIDE_SEPARATOR)
+        spans.append((position, position + len(chunk)))
+        parts.append(SLIDE_SEPARATOR)
+        parts.append(chunk)
+        position += len(chunk)
+    parts.append(END_DOCUMENT)
+    return b''.join(parts), spans
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write data to a temp file next to path and rename it over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.bsg-save-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        else:
+            # mkstemp files are owner-only; new decks follow the umask instead
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)
+        os.replace(temp_path, path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def write_deck(path: str, header: str, slides, source: bytes = b'') -> bytes:
+    """
+    Save slides to path and return the bytes now on disk. Nothing is written
+    when the file on disk already holds the result. Afterwards every slide is
+    clean and its span points into the returned bytes.
+    """
+    data, spans = serialize_deck(header, slides, source)
+    # Compare with the disk, not source: the file may have changed since it was loaded
+    try:
+        with open(path, 'rb') as f:
+            current = f.read()
+    except OSError:
+        current = None
+    if data != current:
+        write_atomic(path, data)
+    for slide, span in zip(slides, spans):
+        slide.span = span
+        slide.dirty = False
+    return data
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+BSG_spellcheck.py
+Incremental spell checking for the BSG-IDE editors.
+
+Lines are tokenized once with their offsets, dictionary lookups are memoized
+in an LRU cache, and all of it runs on a background thread. The IDE submits
+only the lines that changed and applies the returned spans on the UI thread.
+The dictionary itself can be built lazily on that thread through loader.
+"""
+import re
+import queue
+import threading
+from collections import OrderedDict
+
+# LaTeX syntax that is never spell checked: comments, URLs, commands,
+# [RGB]{...} specs and brace groups (colors, media names, arguments)
+SKIP_PATTERN = r'%.*$|https?://\S+|\\[a-zA-Z]+|\[RGB\]\{[^\}]*\}|\{.*?\}'
+TOKEN_REGEX = re.compile(rf'(?P<skip>{SKIP_PATTERN})|(?P<word>\b[^\W\d_]{{4,}}\b)')
+DEFAULT_CACHE_SIZE = 20000
+
+
+def tokenize(line: str) -> list:
+    """Return (start, end, word) for every checkable word of line"""
+    return [(m.start(), m.end(), m.group()) for m in TOKEN_REGEX.finditer(line)
+            if m.lastgroup == 'word']
+
+
+class SpellCheckEngine:
+    """
+    Background spell checker. submit(key, lines) queues (line_no, text)
+    pairs; results() returns (key, {line_no: (text, [(start, end), ...])})
+    for every finished job. text is echoed back so stale results can be
+    recognised and dropped. Pass either a spell_checker or a loader that
+    builds one; the loader runs when the background thread starts.
+    """
+
+    def __init__(self, spell_checker=None, cache_size: int = DEFAULT_CACHE_SIZE, loader=None):
+        self._spell_checker = spell_checker
+        self.loader = loader
+        self.load_lock = threading.Lock()
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.done = queue.Queue()
+        self.pending = 0
+        self.thread = None
+
+    @property
+    def spell_checker(self):
+        """The underlying SpellChecker, built by loader on first use"""
+        if self._spell_checker is None:
+            with self.load_lock:
+                if self._spell_checker is None:
+                    self._spell_checker = self.loader()
+        return self._spell_checker
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the dictionary is ready; until then spell_checker blocks on the loader"""
+        return self._spell_checker is not None
+
+    def is_known(self, word: str) -> bool:
+        """Memoized `word in spell_checker`"""
+        word = word.lower()
+        with self.cache_lock:
+            known = self.cache.get(word)
+            if known is not None:
+                self.cache.move_to_end(word)
+                return known
+
+        known = word in self.spell_checker
+        with self.cache_lock:
+            self.cache[word] = known
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return known
+
+    def add_word(self, word: str) -> None:
+        """Add word to the dictionary and update the cache"""
+        self.spell_checker.word_frequency.add(word)
+        with self.cache_lock:
+            self.cache[word.lower()] = True
+
+    def check_line(self, text: str) -> list:
+        """(start, end) spans of misspelled words in one line"""
+        return [(start, end) for start, end, word in tokenize(text) if not self.is_known(word)]
+
+    def submit(self, key, lines) -> None:
+        """Queue lines for checking in the background"""
+        self.pending += 1
+        self.jobs.put((key, list(lines)))
+        self.start()
+
+    def start(self) -> None:
+        """Start the background thread (which also loads the dictionary)"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="bsg-spellcheck", daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        try:
+            self.spell_checker
+        except Exception as e:
+            print(f"Spell check error: {str(e)}")
+        while True:
+            key, lines = self.jobs.get()
+            try:
+                misspelled = {line_no: (text, self.check_line(text)) for line_no, text in lines}
+            except Exception as e:
+                print(f"Spell check error: {str(e)}")
+                misspelled = {}
+            self.done.put((key, misspelled))
+
+    def results(self) -> list:
+        """Finished jobs, oldest first"""
+        finished = []
+        while True:
+            try:
+                finished.append(self.done.get_nowait())
+            except queue.Empty:
+                break
+        self.pending -= len(finished)
+        return finished
+
+    def busy(self) -> bool:
+        return self.pending > 0
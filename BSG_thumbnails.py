@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+BSG_thumbnails.py
+Background thumbnail generation for the media browser.
+
+Thumbnails are rendered in a thread pool and stored under ~/.bsg-ide/thumbs,
+keyed by (path, mtime, size), so reopening a folder only decodes files that
+changed. JPEGs are downscaled while decoding through Image.draft(); videos
+use their first frame (OpenCV) and PDFs their first page (PyMuPDF).
+"""
+import os
+import importlib.util
+import queue
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+THUMB_SIZE = (150, 150)
+DEFAULT_CACHE_DIR = Path.home() / '.bsg-ide' / 'thumbs'
+CACHE_VERSION = 1
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff', '.webp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv', '.wmv')
+PDF_EXTENSIONS = ('.pdf',)
+
+
+def thumbnail_key(path: str, size=THUMB_SIZE) -> str:
+    """Cache key of path's thumbnail; changes whenever the file does"""
+    stat = os.stat(path)
+    ident = f"{CACHE_VERSION}\0{os.path.abspath(path)}\0{stat.st_mtime_ns}\0{stat.st_size}\0{size[0]}x{size[1]}"
+    return hashlib.sha1(ident.encode('utf-8')).hexdigest()
+
+
+def fit_thumbnail(img, size=THUMB_SIZE):
+    """Scale img into size and center it on a black background"""
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    thumb = Image.new('RGB', size, 'black')
+    thumb.paste(img, ((size[0] - img.size[0]) // 2, (size[1] - img.size[1]) // 2))
+    return thumb
+
+
+def render_image_thumbnail(path: str, size=THUMB_SIZE):
+    """Decode an image file (first frame for animations) at roughly thumbnail resolution"""
+    with Image.open(path) as img:
+        # JPEG decoders can scale by 1/2..1/8 while decoding; other formats ignore this
+        img.draft('RGB', (size[0] * 2, size[1] * 2))
+        img.seek(0)
+        img.load()
+        return fit_thumbnail(img, size)
+
+
+def render_video_thumbnail(path: str, size=THUMB_SIZE):
+    """First frame of a video, as generate_preview_frame does for slides"""
+    import cv2
+
+    cap = cv2.VideoCapture(path)
+    try:
+        ret, frame = cap.read()
+    finally:
+        cap.release()
+    if not ret:
+        raise ValueError(f"Could not read a frame from {path}")
+
+    height, width = frame.shape[:2]
+    scale = min(size[0] / width, size[1] / height, 1.0)
+    if scale < 1.0:
+        frame = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+    return fit_thumbnail(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)), size)
+
+
+def render_pdf_thumbnail(path: str, size=THUMB_SIZE):
+    """First page of a PDF, rasterized directly at thumbnail size"""
+    import fitz
+
+    doc = fitz.open(path)
+    try:
+        page = doc[0]
+        zoom = min(size[0] / page.rect.width, size[1] / page.rect.height)
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        return fit_thumbnail(Image.frombytes("RGB", (pix.width, pix.height), pix.samples), size)
+    finally:
+        doc.close()
+
+
+_available_modules = {}
+
+
+def _module_available(name: str) -> bool:
+    if name not in _available_modules:
+        _available_modules[name] = importlib.util.find_spec(name) is not None
+    return _available_modules[name]
+
+
+def renderer_for(path: str):
+    """Thumbnail renderer for path, or None when the type (or its library) is unsupported"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in IMAGE_EXTENSIONS:
+        return render_image_thumbnail
+    if ext in VIDEO_EXTENSIONS and _module_available('cv2'):
+        return render_video_thumbnail
+    if ext in PDF_EXTENSIONS and _module_available('fitz'):
+        return render_pdf_thumbnail
+    return None
+
+
+class ThumbnailCache:
+    """On-disk thumbnail store under ~/.bsg-ide/thumbs"""
+
+    def __init__(self, cache_dir=None, size=THUMB_SIZE):
+        self.cache_dir = Path(cache_dir or os.environ.get('BSG_THUMB_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.size = size
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"Warning: Thumbnail cache unavailable: {str(e)}")
+
+    def cache_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.jpg"
+
+    def load(self, key: str):
+        """Cached thumbnail for key, or None"""
+        try:
+            with Image.open(self.cache_path(key)) as img:
+                img.load()
+                return img.copy()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key: str, thumb) -> None:
+        """Write thumb atomically; concurrent writers of one key are harmless"""
+        path = self.cache_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                thumb.save(f, 'JPEG', quality=85)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not cache thumbnail: {str(e)}")
+
+    def get(self, path: str, render=render_image_thumbnail):
+        """Thumbnail of path, rendering and caching it on a miss"""
+        key = thumbnail_key(path, self.size)
+        thumb = self.load(key)
+        if thumb is None:
+            thumb = render(path, self.size)
+            self.store(key, thumb)
+        return thumb
+
+
+class ThumbnailLoader:
+    """
+    Thread pool producing thumbnails for the UI. submit(path) queues a file;
+    results() returns (generation, path, image_or_None) for finished ones.
+    cancel() starts a new generation so results for a previous folder or
+    sort order can be dropped by the caller.
+    """
+
+    def __init__(self, cache=None, max_workers=None):
+        self.cache = cache or ThumbnailCache()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or min(4, os.cpu_count() or 1),
+            thread_name_prefix="bsg-thumbs"
+        )
+        self.done = queue.Queue()
+        self.generation = 0
+        self.futures = []
+        self.lock = threading.Lock()
+
+    def submit(self, path: str, render=render_image_thumbnail) -> None:
+        generation = self.generation
+        with self.lock:
+            self.futures.append(self.executor.submit(self._run, generation, path, render))
+
+    def _run(self, generation, path, render):
+        if generation != self.generation:
+            return
+        try:
+            thumb = self.cache.get(path, render)
+        except Exception as e:
+            print(f"Error creating thumbnail for {path}: {str(e)}")
+            thumb = None
+        self.done.put((generation, path, thumb))
+
+    def results(self, limit: int = 32) -> list:
+        """Up to limit finished thumbnails, oldest first"""
+        finished = []
+        while len(finished) < limit:
+            try:
+                finished.append(self.done.get_nowait())
+            except queue.Empty:
+                break
+        return finished
+
+    def busy(self) -> bool:
+        with self.lock:
+            self.futures = [f for f in self.futures if not f.done()]
+            return bool(self.futures) or not self.done.empty()
+
+    def cancel(self) -> None:
+        """Drop queued work; running jobs finish but are tagged stale"""
+        self.generation += 1
+        with self.lock:
+            for future in self.futures:
+                future.cancel()
+            self.futures = []
+
+    def shutdown(self) -> None:
+        self.cancel()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+BSG_trace.py
+Stage-level tracing for the conversion pipeline.
+
+Spans time the stages of a build (parsing, media resolution, downloads,
+conversions, preview frames, LaTeX generation, writes), and counters
+track totals such as bytes downloaded, cache hits and frames emitted.
+Results are exported as Chrome trace-event JSON (chrome://tracing or
+https://ui.perfetto.dev) and as a text summary.
+
+Tracing is off unless BSG_TRACE is set (a .json path, or 1 for
+./bsg-trace.json) or enable() is called, e.g. by `bsg build --trace`.
+While off, span() returns a shared no-op and count() returns at once.
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import threading
+
+DEFAULT_TRACE_FILE = 'bsg-trace.json'
+
+_enabled = False
+_output = None
+_events = []
+_counters = {}
+_threads = {}
+_lock = threading.Lock()
+_exit_hook = False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        thread = threading.current_thread()
+        pid = os.getpid()
+        event = {'name': self.name, 'ph': 'X', 'pid': pid, 'tid': thread.ident,
+                 'ts': self.start * 1e6, 'dur': (end - self.start) * 1e6}
+        if self.args:
+            event['args'] = self.args
+        # take_events() may be iterating these on another thread
+        with _lock:
+            _threads[(pid, thread.ident)] = thread.name
+            _events.append(event)
+        return False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable(output: str = None) -> None:
+    """
+    Start recording. With an output path, the trace is written there and
+    a summary printed to stderr when the process exits.
+    """
+    global _enabled, _output, _exit_hook
+    _enabled = True
+    _output = os.path.abspath(output) if output else None
+    if output and not _exit_hook:
+        atexit.register(_export_at_exit)
+        _exit_hook = True
+
+
+def disable() -> None:
+    global _enabled, _output
+    _enabled = False
+    _output = None
+
+
+def span(name: str, **args):
+    """Context manager timing one stage; args are shown in the trace viewer"""
+    if not _enabled:
+        return NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name: str = None):
+    """Decorator recording a span for every call of the function"""
+    def decorate(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(label, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name: str, value=1) -> None:
+    """Add value to counter name"""
+    if not _enabled:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + value
+        _events.append({'name': name, 'ph': 'C', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                        'ts': time.perf_counter() * 1e6, 'args': {name: total}})
+
+
+def take_events() -> list:
+    """Remove and return the events recorded so far (used to ship them between processes)"""
+    with _lock:
+        events = _events[:]
+        del _events[:len(events)]
+        events.extend({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                       'args': {'name': thread_name}}
+                      for (pid, tid), thread_name in _threads.items())
+        _threads.clear()
+    return events
+
+
+def add_events(events) -> None:
+    """Merge events taken in another process"""
+    with _lock:
+        _events.extend(events)
+
+
+def chrome_trace(events) -> dict:
+    """Chrome trace-event document for events, with timestamps starting at 0"""
+    timed = [event['ts'] for event in events if 'ts' in event]
+    origin = min(timed) if timed else 0
+    trace_events = []
+    for event in events:
+        if 'ts' in event:
+            event = dict(event, ts=round(event['ts'] - origin, 3))
+            if 'dur' in event:
+                event['dur'] = round(event['dur'], 3)
+        trace_events.append(event)
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+
+def summary(events, slowest: int = 10) -> str:
+    """Text summary: time per stage, counter totals and the slowest slides"""
+    stages = {}
+    counters = {}
+    slides = []
+    fetches = {}
+    for event in events:
+        if event['ph'] == 'X':
+            calls, total, longest = stages.get(event['name'], (0, 0.0, 0.0))
+            stages[event['name']] = (calls + 1, total + event['dur'], max(longest, event['dur']))
+            if event['name'] == 'slide':
+                slides.append(event)
+            elif event['name'] == 'resolve_remote_media':
+                key = (event['pid'], event['args']['url'])
+                fetches[key] = fetches.get(key, 0) + event['dur']
+        elif event['ph'] == 'C':
+            # Counters are cumulative per process
+            key = (event['pid'], event['name'])
+            counters[key] = max(counters.get(key, 0), event['args'][event['name']])
+
+    lines = [f"{'stage':40} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+    for name, (calls, total, longest) in sorted(stages.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{name[:40]:40} {calls:7d} {total / 1000:10.1f} "
+                     f"{total / calls / 1000:9.2f} {longest / 1000:9.1f}")
+
+    totals = {}
+    for (_, name), value in counters.items():
+        totals[name] = totals.get(name, 0) + value
+    if totals:
+        lines.append("")
+        lines.extend(f"{name:40} {value:>12,}" for name, value in sorted(totals.items()))
+
+    if slides:
+        # Remote media is fetched ahead of the slides; charge it to the slides using it
+        costs = []
+        for event in slides:
+            media = event.get('args', {}).get('media') or ''
+            fetch = sum(dur for (pid, url), dur in fetches.items() if pid == event['pid'] and url in media)
+            costs.append((event['dur'] + fetch, event))
+        lines.append("")
+        lines.append("slowest slides (including media fetches):")
+        for cost, event in sorted(costs, key=lambda item: -item[0])[:slowest]:
+            args = event.get('args', {})
+            lines.append(f"  {cost / 1000:9.1f} ms  #{args.get('index', '?')} "
+                         f"{args.get('title') or '(untitled)'}  {args.get('deck', '')}".rstrip())
+    return "\n".join(lines)
+
+
+def export(path: str, stream=None) -> None:
+    """Write the recorded trace to path and its summary to stream (stderr by default)"""
+    events = take_events()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(events), f)
+    stream = stream or sys.stderr
+    stream.write(summary(events) + "\n")
+    stream.write(f"Trace written to {path}\n")
+
+
+def _export_at_exit():
+    if _enabled and _output and _events:
+        try:
+            export(_output)
+        except OSError as e:
+            print(f"Warning: Could not write trace: {str(e)}", file=sys.stderr)
+
+
+def _enable_from_env():
+    value = os.environ.get('BSG_TRACE', '').strip()
+    if value and value.lower() not in ('0', 'false', 'no', 'off'):
+        enable(value if value.lower().endswith('.json') else DEFAULT_TRACE_FILE)
+
+
+_enable_from_env()
@@ -7,24 +7,38 @@ Supports local files, URL downloads, and content-only slides.
 import math
 import os,re
 import time
-import requests
-import webbrowser
-from PIL import Image
-import customtkinter as ctk
-from tkinter import messagebox
-import tkinter as tk
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from BSG_lazy import lazy_import
+from BSG_fetch import get_fetcher
+from BSG_parser import DeckParser
+from BSG_media_cache import flush_media_cache, get_media_cache
+from BSG_trace import count, span, traced
 from urllib.parse import urlparse, unquote
 from pathlib import Path
 import mimetypes
+
+# Loaded on first use so the converter starts without them
+requests = lazy_import('requests')
+webbrowser = lazy_import('webbrowser')
+Image = lazy_import('PIL.Image')
+
 output_dir = ""
 #--------------------------------------------------------------------------------------------------------
-def set_terminal_io(term_io):
-    """Set the terminal I/O object and verify it's working"""
-    global terminal_io
-    terminal_io = term_io
-    # Verify terminal_io is working
-    if terminal_io:
-        terminal_io.write("Terminal I/O initialized\n", "green")
+def emit(on_event, action, **data):
+    """
+    Report a conversion event. Front ends (the IDE, batch builds) pass an
+    on_event(action, data) callback; without one, messages are printed.
+    Actions: "message" (text, color), "error" (message) and
+    "missing_media" (media, title).
+    """
+    if on_event:
+        on_event(action, data)
+    elif action == "message":
+        print(data.get('text', ''), end='')
+    elif action == "error":
+        print(f"Error: {data.get('message', 'Unknown error')}")
 #--------------------------------------------------------------------------------------------------------
 
 def verify_required_packages(preamble_content: str) -> list:
@@ -49,6 +63,7 @@ def verify_required_packages(preamble_content: str) -> list:
 
     return missing
 
+@traced()
 def generate_preview_frame(filepath, output_path=None):
     """
     Generates a preview frame for different media types.
@@ -640,7 +655,7 @@ def validate_url(url):
         cleaned_url = url.split()[-1] if url.split() else url
 
         # Check if URL is accessible
-        response = requests.head(cleaned_url, timeout=5)
+        response = get_fetcher().head(cleaned_url, timeout=5)
         if response.status_code == 403:
             return False, "Access Forbidden - This URL requires authentication or is not publicly accessible"
         elif response.status_code == 404:
@@ -684,9 +699,7 @@ import subprocess
 import tempfile
 from pathlib import Path
 import mimetypes
-from PIL import Image
 import io
-import requests
 import shutil
 
 class MediaConverter:
@@ -712,7 +725,8 @@ class MediaConverter:
         # Max dimensions for images
         self.max_dimensions = (1920, 1080)
 
-    def convert_from_url(self, url: str, output_folder: str = 'media_files') -> tuple:
+    def convert_from_url(self, url: str, output_folder: str = 'media_files', use_cache: bool = True,
+                         progress=None) -> tuple:
         """
         Download and convert media from URL to appropriate format.
         Returns (success, file_path, media_type)
@@ -721,19 +735,11 @@ class MediaConverter:
             # Create media_files directory if it doesn't exist
             os.makedirs(output_folder, exist_ok=True)
 
-            # Download content to temporary file
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
+            if use_cache:
+                return self._convert_from_cache(url, output_folder, progress)
 
-            # Get content type and extension
-            content_type = response.headers.get('content-type', '').split(';')[0]
-            ext = mimetypes.guess_extension(content_type) or '.tmp'
-
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    temp_file.write(chunk)
-                temp_path = temp_file.name
+            # Stream the body once into a temporary file
+            temp_path = self.download_to_temp(url, progress=progress)
 
             # Convert the downloaded file
             return self.convert_file(temp_path, output_folder)
@@ -750,6 +756,47 @@ class MediaConverter:
                 except:
                     pass
 
+    def _convert_from_cache(self, url: str, output_folder: str, progress=None) -> tuple:
+        """Convert url via the persistent media cache, reusing earlier conversions"""
+        cache = get_media_cache()
+        blob_path = cache.fetch(url, progress=progress)
+
+        # Same body already converted into this folder: nothing to do
+        cached = cache.get_output(url, output_folder)
+        if cached:
+            return True, os.path.join(output_folder, os.path.basename(cached[0])), cached[1]
+
+        success, output_path, media_type = self.convert_file(blob_path, output_folder)
+        if success:
+            cache.record_output(url, output_folder, output_path, media_type)
+        return success, output_path, media_type
+
+    def download_to_temp(self, url: str, timeout=None, progress=None) -> str:
+        """
+        Stream url into a temporary file in a single request.
+        Returns the temporary file path; the caller is responsible for removing it.
+        """
+        fetcher = get_fetcher()
+        with fetcher.stream(url, timeout=timeout) as response:
+            response.raise_for_status()
+
+            # Get content type and extension
+            content_type = response.headers.get('content-type', '').split(';')[0]
+            ext = mimetypes.guess_extension(content_type) or '.tmp'
+
+            # Create temporary file
+            with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as temp_file:
+                try:
+                    for chunk in fetcher.iter_body(response, progress):
+                        temp_file.write(chunk)
+                except BaseException:
+                    # Don't leave a partial download behind; the caller never sees its path
+                    temp_file.close()
+                    os.unlink(temp_file.name)
+                    raise
+                return temp_file.name
+
+    @traced()
     def convert_file(self, input_path: str, output_folder: str = 'media_files') -> tuple:
         """
         Convert file to appropriate format based on content type.
@@ -939,6 +986,7 @@ def convert_media(url_or_path: str, output_folder: str = 'media_files') -> tuple
     else:
         return converter.convert_file(url_or_path, output_folder)
 
+@traced()
 def download_media(url, output_folder='media_files'):
     """
     Enhanced version with source tracking and automatic format conversion.
@@ -968,11 +1016,7 @@ def download_media(url, output_folder='media_files'):
 
         # Handle regular URLs
         try:
-            # First download the content
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-
-            # Convert the downloaded content
+            # Fetch and convert in a single streamed download
             success, converted_path, media_type = convert_media(url, output_folder)
 
             if success:
@@ -1017,6 +1061,8 @@ def download_media(url, output_folder='media_files'):
 
                 return base_name, filename, first_frame_path
 
+            return None, None, None
+
         except requests.exceptions.RequestException as e:
             print(f"Error downloading from URL {url}: {str(e)}")
             return None, None, None
@@ -1211,6 +1257,7 @@ def process_latex_content(content_line: str) -> str:
 
     return ''.join(result)
 #----------------------------------------------------------------------
+@traced()
 def generate_latex_code(base_name, filename, first_frame_path, content=None, title=None, playable=False, source_url=None, layout=None):
     """Generate LaTeX code with support for all media layouts."""
 
@@ -1543,8 +1590,13 @@ def verify_media_file(filepath):
     return None
 
 
-def process_media(url, content=None, title=None, playable=False, slide_index=None, callback=None):
-    """Process media with graceful handling of missing files and URLs"""
+def process_media(url, content=None, title=None, playable=False, slide_index=None, callback=None, resolved_media=None, on_event=None):
+    """
+    Process media with graceful handling of missing files and URLs.
+    resolved_media maps remote URLs to (base_name, filename, first_frame_path)
+    results that were already fetched by prefetch_remote_media. on_event
+    receives conversion events (see emit).
+    """
 
 
     try:
@@ -1613,7 +1665,20 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
         # Handle URLs in \play directive
         if directive_type == 'url' and playable:
             if media_source.startswith(('http://', 'https://')):
-                if 'youtube.com' in media_source or 'youtu.be' in media_source:
+                if resolved_media and media_source in resolved_media:
+                    # Already downloaded by the prefetch stage
+                    base_name, filename, first_frame_path = resolved_media[media_source]
+                    if base_name and filename:
+                        return generate_latex_code(
+                            base_name,
+                            f"media_files/{filename}",
+                            first_frame_path,
+                            content,
+                            title,
+                            True,
+                            media_source
+                        ), f"\\play \\file media_files/{filename}"
+                elif 'youtube.com' in media_source or 'youtu.be' in media_source:
                     # Download YouTube video
                     result = download_youtube_video(media_source)
                     if result:
@@ -1645,7 +1710,10 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
         # Handle regular URLs
         elif directive_type == 'url' :
             if media_source.startswith(('http://', 'https://')):
-                base_name, filename, first_frame_path = download_media(media_source)
+                if resolved_media and media_source in resolved_media:
+                    base_name, filename, first_frame_path = resolved_media[media_source]
+                else:
+                    base_name, filename, first_frame_path = download_media(media_source)
                 if base_name and filename:
                     return generate_latex_code(
                         base_name,
@@ -1692,16 +1760,16 @@ def process_media(url, content=None, title=None, playable=False, slide_index=Non
         # If we get here, the media wasn't handled
         if callback and slide_index is not None:
             callback(slide_index)
-        return handle_missing_media(url, content, title, playable)
+        return handle_missing_media(url, content, title, playable, on_event)
 
     except Exception as e:
         print(f"Error processing media: {str(e)}")
-        return handle_missing_media(url, content, title, playable)
+        return handle_missing_media(url, content, title, playable, on_event)
 
 
 import urllib.parse
 
-def update_text_file(file_path, line_number, new_directive):
+def update_text_file(file_path, line_number, new_directive, on_event=None):
     """Update the text file with new directive"""
     if not file_path or not line_number:
         return
@@ -1724,8 +1792,7 @@ def update_text_file(file_path, line_number, new_directive):
                     result = urllib.parse.urlparse(original_directive)
                     if all([result.scheme, result.netloc]):
                         # The original directive is a URL, do not replace it
-                        if terminal_io:
-                            terminal_io.write(f"Skipping update at line {line_number} as it contains a URL\n", "yellow")
+                        emit(on_event, "message", text=f"Skipping update at line {line_number} as it contains a URL\n", color="yellow")
                         return
                 except ValueError:
                     pass
@@ -1741,8 +1808,7 @@ def update_text_file(file_path, line_number, new_directive):
                     result = urllib.parse.urlparse(original_directive)
                     if all([result.scheme, result.netloc]):
                         # The original directive is a URL, do not replace it
-                        if terminal_io:
-                            terminal_io.write(f"Skipping update at line {line_number} as it contains a URL\n", "yellow")
+                        emit(on_event, "message", text=f"Skipping update at line {line_number} as it contains a URL\n", color="yellow")
                         return
                 except ValueError:
                     pass
@@ -1754,22 +1820,21 @@ def update_text_file(file_path, line_number, new_directive):
             with open(file_path, 'w') as f:
                 f.writelines(lines)
 
-            if terminal_io:
-                terminal_io.write(f"✓ File updated successfully at line {line_number}\n", "green")
+            emit(on_event, "message", text=f"✓ File updated successfully at line {line_number}\n", color="green")
 
     except Exception as e:
-        if terminal_io:
-            terminal_io.write(f"Error updating file: {str(e)}\n", "red")
+        emit(on_event, "error", message=f"Error updating file: {str(e)}")
 
 
-def handle_missing_media(original_url, content, title, playable):
-    """Handle missing media gracefully in GUI mode by defaulting to \\None"""
+def handle_missing_media(original_url, content, title, playable, on_event=None):
+    """
+    Handle missing media. With an on_event listener (IDE, batch builds) the
+    slide defaults to \\None and a "missing_media" event is sent; otherwise
+    the user is asked on the console.
+    """
     try:
-        # Check if we're in GUI mode (IDE)
-        in_gui_mode = terminal_io and hasattr(terminal_io, 'editor')
-
-        if in_gui_mode:
-            # In GUI mode, silently default to \None
+        if on_event:
+            emit(on_event, "missing_media", media=original_url, title=title)
             latex_code = generate_latex_code(None, "\\None", None, content, title, False)
             return latex_code, ("\\None", "\\None")
         else:
@@ -1890,15 +1955,28 @@ def handle_missing_media_fallback(original_url, content, title, playable):
 
 
 
-# Initialize terminal_io as None - will be set by IDE
-terminal_io = None
-
 
+@traced()
 def download_youtube_video(url, file_path=None):
     """
     Downloads YouTube video and returns file information.
     Returns (base_name, filename, filepath) or None if download fails.
     """
+    os.makedirs('media_files', exist_ok=True)
+    clean_url = url.replace('\\play', '').strip()
+
+    # Reuse a previous download of the same video
+    cache = get_media_cache()
+    cached = cache.get_output(clean_url, 'media_files')
+    if cached:
+        count('media_cache_hits')
+        filename = os.path.basename(cached[0])
+        print(f"Using cached video: {filename}")
+        return os.path.splitext(filename)[0], filename, os.path.join('media_files', filename)
+    if cache.offline:
+        print(f"Offline mode: {clean_url} is not in the media cache")
+        return None
+
     try:
         import yt_dlp
     except ImportError:
@@ -1907,8 +1985,6 @@ def download_youtube_video(url, file_path=None):
         import yt_dlp
 
     print("\nDownloading YouTube video...")
-    os.makedirs('media_files', exist_ok=True)
-    clean_url = url.replace('\\play', '').strip()
 
     ydl_opts = {
         'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
@@ -1942,6 +2018,7 @@ def download_youtube_video(url, file_path=None):
             if os.path.exists(output_path):
                 base_name = os.path.splitext(safe_filename)[0]
                 print(f"Video downloaded successfully to: {output_path}")
+                cache.record_output(clean_url, 'media_files', output_path, 'video')
                 return base_name, safe_filename, output_path
 
             print(f"Error: Downloaded file not found at {output_path}")
@@ -1979,42 +2056,32 @@ def update_input_file(file_path, url_updates, is_tex_file=False):
             f.writelines(original_content)
 
         # Only process updates that are explicitly marked for change
-        updated_lines = []
-        in_content_block = False
-
-        for line in original_content:
-            line = line.rstrip('\n')
-
-            if line.startswith("\\begin{Content}"):
-                in_content_block = True
-                content_parts = line.split("\\begin{Content}", 1)
-                if len(content_parts) > 1 and content_parts[1].strip():
-                    url_part = content_parts[1].strip()
-                    if url_part in url_updates and url_updates[url_part] is not None:
-                        # Only update if we have an explicit new directive
-                        new_directive = url_updates[url_part][0] if is_tex_file else url_updates[url_part][1]
-                        line = f"\\begin{{Content}} {new_directive}"
-                updated_lines.append(line)
-                continue
+        def replacement(directive):
+            if directive in url_updates and url_updates[directive] is not None:
+                return url_updates[directive][0] if is_tex_file else url_updates[directive][1]
+            return None
 
-            elif in_content_block and (line.startswith(("http", "\\play", "\\file")) or not line.strip()):
-                if line in url_updates and url_updates[line] is not None:
-                    new_directive = url_updates[line][0] if is_tex_file else url_updates[line][1]
-                    updated_lines.append(new_directive)
-                else:
-                    updated_lines.append(line)
+        updated_lines = [line.rstrip('\n') for line in original_content]
+        for slide in DeckParser(original_content):
+            if slide.content_start is None:
                 continue
 
-            elif line.startswith("\\end{Content}"):
-                in_content_block = False
-                updated_lines.append(line)
-                continue
+            # Directive on the \begin{Content} line
+            new_directive = replacement(slide.media) if slide.media else None
+            if new_directive is not None:
+                updated_lines[slide.content_start - 1] = f"\\begin{{Content}} {new_directive}"
 
-            else:
-                updated_lines.append(line)
+            # Media lines inside the block
+            block_end = slide.content_end or slide.end_line + 1
+            for line_no in range(slide.content_start + 1, block_end):
+                line = updated_lines[line_no - 1]
+                if line.startswith(("http", "\\play", "\\file")) or not line.strip():
+                    new_directive = replacement(line)
+                    if new_directive is not None:
+                        updated_lines[line_no - 1] = new_directive
 
         # Only write if there were actual changes
-        if updated_lines != original_content:
+        if updated_lines != [line.rstrip('\n') for line in original_content]:
             with open(file_path, 'w') as f:
                 for line in updated_lines:
                     f.write(line + '\n')
@@ -2030,6 +2097,7 @@ def update_input_file(file_path, url_updates, is_tex_file=False):
         print(f"Error updating file: {str(e)}")
         return False
 
+@traced()
 def parse_media_directive(directive_string):
     """Parse media directive string into components.
     Returns: (directive_type, media_source, playable, original_directive)"""
@@ -2192,18 +2260,200 @@ def format_url_note(url):
 
 
 #------------------------------------------------------
-def process_input_file(file_path, output_filename='movie.tex', ide_callback=None):
-    """Process input file to convert to TeX format with proper slide navigation"""
+FRAME_CACHE_VERSION = 1
+
+class FrameCache:
+    """
+    Content-addressed cache of generated frame LaTeX.
+    Stored next to the output .tex so unchanged slides can be spliced in
+    without going through process_media/generate_latex_code again.
+    """
+
+    def __init__(self, output_filename):
+        self.cache_path = os.path.splitext(output_filename)[0] + '.framecache.json'
+        self.entries = {}
+        self.used = set()
+        self.hits = 0
+        self.misses = 0
+        self._generator_signature = None
+        self.load()
+
+    def load(self):
+        """Load cache entries from disk, ignoring stale or corrupt caches"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == FRAME_CACHE_VERSION:
+                self.entries = data.get('frames', {})
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        """Write back only the entries used by this run so the cache cannot grow without bound"""
+        try:
+            frames = {key: self.entries[key] for key in self.used if key in self.entries}
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': FRAME_CACHE_VERSION, 'frames': frames}, f)
+        except OSError as e:
+            print(f"Warning: Could not write frame cache: {str(e)}")
+
+    def generator_signature(self):
+        """Hash of this module so edits to the generator invalidate cached frames"""
+        if self._generator_signature is None:
+            try:
+                with open(os.path.abspath(__file__), 'rb') as f:
+                    self._generator_signature = hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                self._generator_signature = ''
+        return self._generator_signature
+
+    @staticmethod
+    def media_stamps(media):
+        """Return (path, mtime, size) for every local file a media directive refers to"""
+        if not media:
+            return []
+        directive_type, media_source, _, _ = parse_media_directive(media)
+        if not media_source or directive_type in ('url', 'none'):
+            return []
+        paths = [p.strip() for p in media_source.split(',')] if directive_type == 'mosaic' else [media_source]
+        stamps = []
+        for path in paths:
+            candidates = [path, os.path.join('media_files', os.path.basename(path))]
+            for candidate in candidates:
+                try:
+                    st = os.stat(candidate)
+                    stamps.append([candidate, st.st_mtime_ns, st.st_size])
+                    break
+                except OSError:
+                    continue
+            else:
+                stamps.append([path, None, None])
+        return stamps
+
+    def key(self, title, content, notes, media):
+        """Compute the content hash of a frame"""
+        payload = json.dumps([
+            FRAME_CACHE_VERSION,
+            self.generator_signature(),
+            title,
+            media,
+            list(content or []),
+            list(notes or []),
+            self.media_stamps(media)
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return cached LaTeX for key, or None if missing or its media outputs are gone"""
+        entry = self.entries.get(key)
+        if entry and all(os.path.exists(path) for path in entry.get('files', [])):
+            self.used.add(key)
+            self.hits += 1
+            return entry['latex']
+        self.misses += 1
+        return None
+
+    def put(self, key, latex_code, directive):
+        """Store a regenerated frame along with the media files it references"""
+        files = re.findall(r'\\includegraphics(?:\[[^\]]*\])?\{([^}]*)\}', latex_code)
+        if isinstance(directive, str):
+            _, media_source, _, _ = parse_media_directive(directive)
+            if media_source and directive.split()[0] in ('\\file', '\\play'):
+                files.append(media_source)
+        self.entries[key] = {'latex': latex_code, 'files': sorted(set(files))}
+        self.used.add(key)
+
+
+def resolve_remote_media(media_source):
+    """
+    Download one remote media item and prepare its preview frame.
+    Returns (base_name, filename, first_frame_path) like download_media.
+    """
+    with span('resolve_remote_media', url=media_source):
+        if 'youtube.com' in media_source or 'youtu.be' in media_source:
+            result = download_youtube_video(media_source)
+            if not result:
+                return None, None, None
+            base_name, filename, filepath = result
+            return base_name, filename, generate_preview_frame(filepath)
+        return download_media(media_source) or (None, None, None)
+
+def prefetch_remote_media(media_directives, max_workers=8, on_event=None):
+    """
+    Resolve every remote URL referenced by media_directives concurrently.
+    Returns a dict mapping URL to the resolve_remote_media result.
+    """
+    urls = []
+    for media in media_directives:
+        if not media:
+            continue
+        directive_type, media_source, _, _ = parse_media_directive(media)
+        if (directive_type == 'url' and media_source
+                and media_source.startswith(('http://', 'https://'))
+                and media_source not in urls):
+            urls.append(media_source)
+
+    if not urls:
+        return {}
+
+    emit(on_event, "message", text=f"Fetching {len(urls)} remote media item(s)...\n")
+    resolved = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+        futures = {executor.submit(resolve_remote_media, url): url for url in urls}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                resolved[url] = future.result()
+            except Exception as e:
+                emit(on_event, "error", message=f"Error fetching {url}: {str(e)}")
+                resolved[url] = (None, None, None)
+    # Cache hits above only touched the index in memory; write it once
+    flush_media_cache()
+    return resolved
+
+def process_input_file(file_path, output_filename='movie.tex', ide_callback=None, use_cache=True, max_media_workers=8):
+    """
+    Process input file to convert to TeX format with proper slide navigation.
+    ide_callback is the on_event listener for conversion events (see emit);
+    when given, missing media never prompts on the console.
+    """
+    with span('process_input_file', deck=os.path.basename(file_path)):
+        return _process_input_file(file_path, output_filename, ide_callback, use_cache, max_media_workers)
+
+def _process_input_file(file_path, output_filename, ide_callback, use_cache, max_media_workers):
     processed = 0
     failed = 0
     errors = []
+    deck = os.path.basename(file_path)
 
     try:
-        with open(file_path, 'r') as f:
-            lines = f.readlines()
-
-        # Get preamble information first
-        has_preamble, preamble_lines, content_lines, has_titlepage, has_maketitle = detect_preamble(lines)
+        # Collect frames first so unchanged ones can be spliced in from the cache
+        with span('parse'):
+            parser = DeckParser(file_path)
+            frames = []
+            for slide in parser:
+                frames.append((slide.title, [line.strip() for line in slide.content],
+                               frame_notes(slide.notes), slide.media))
+            has_end_document = parser.has_end_document
+
+        # Preamble information comes from the lines before the first slide
+        has_preamble, preamble_lines, _, has_titlepage, has_maketitle = detect_preamble(parser.header_lines)
+
+        # Look up cached frames, then fetch remote media for the dirty ones concurrently
+        with span('frame cache lookup'):
+            cache = FrameCache(output_filename) if use_cache else None
+            frame_jobs = []
+            for title, content, notes, media in frames:
+                key = cache.key(title, content, notes, media) if cache else None
+                latex_code = cache.get(key) if cache else None
+                frame_jobs.append((key, latex_code, title, content, notes, media))
+
+        with span('prefetch remote media'):
+            resolved_media = prefetch_remote_media(
+                [media for _, latex_code, _, _, _, media in frame_jobs if latex_code is None],
+                max_media_workers,
+                ide_callback
+            )
 
         with open(output_filename, 'w') as outfile:
             # Write preamble
@@ -2222,71 +2472,29 @@ def process_input_file(file_path, output_filename='movie.tex', ide_callback=None
                 outfile.write(generate_special_commands())
                 outfile.write("\\begin{document}\n\n")
 
-            i = 0
-            current_frame_notes = []
-            current_frame_content = []
-            current_frame_title = None
-            current_media = None
-            in_content_block = False
-            in_notes_block = False
-
-            while i < len(content_lines):
-                line = content_lines[i].strip()
-
-                # Handle document end
-                if line.startswith('\\end{document}'):
-                    if should_process_frame(current_frame_title, current_frame_content, current_media, current_frame_notes):
-                        # Process last frame
-                        process_frame(outfile, current_frame_title, current_frame_content,
-                                   current_frame_notes, current_media)
-                        processed += 1
-                    outfile.write("\\end{document}\n")
-                    break
-
-                # Handle new frame
-                if line.startswith('\\title'):
-                    # Process previous frame if exists
-                    if should_process_frame(current_frame_title, current_frame_content, current_media, current_frame_notes):
-                        process_frame(outfile, current_frame_title, current_frame_content,
-                                   current_frame_notes, current_media)
-                        processed += 1
-
-                    # Start new frame
-                    current_frame_title = line[6:].strip()  # Remove '\title' prefix
-                    current_frame_content = []
-                    current_frame_notes = []
-                    current_media = None
-
-                # Handle Content blocks
-                elif line.startswith('\\begin{Content}'):
-                    in_content_block = True
-                    if len(line) > len('\\begin{Content}'):
-                        current_media = line[len('\\begin{Content}'):].strip()
-
-                elif line.startswith('\\end{Content}'):
-                    in_content_block = False
-
-                # Handle Notes blocks
-                elif line.startswith('\\begin{Notes}'):
-                    in_notes_block = True
-                elif line.startswith('\\end{Notes}'):
-                    in_notes_block = False
-
-                # Process content
-                elif in_content_block:
-                    if line.strip():  # Only add non-empty lines
-                        current_frame_content.append(line)
-                # Process notes
-                elif in_notes_block:
-                    if line.strip() and not line.startswith('%'):
-                        if line.startswith(('http://', 'https://','www')):
-                            current_frame_notes.append('\\begin{itemize}')
-                            current_frame_notes.append(format_url_note(line.strip()))
-                            current_frame_notes.append('\\end{itemize}')
-                        else:
-                            current_frame_notes.append(line.strip())
-
-                i += 1
+            for index, (key, latex_code, title, content, notes, media) in enumerate(frame_jobs, 1):
+                with span('slide', index=index, title=title, deck=deck, media=media):
+                    if latex_code is None:
+                        count('frame_cache_misses')
+                        latex_code, directive = generate_frame_latex(title, content, notes, media, resolved_media, ide_callback)
+                        # Frames that fell back to missing-media handling are never cached
+                        if cache and not isinstance(directive, tuple):
+                            cache.put(key, latex_code, directive)
+                    else:
+                        count('frame_cache_hits')
+
+                    with span('write'):
+                        outfile.write(latex_code + '\n')
+                    count('frames_emitted')
+                processed += 1
+
+            if has_end_document:
+                outfile.write("\\end{document}\n")
+
+        if cache:
+            with span('frame cache save'):
+                cache.save()
+            emit(ide_callback, "message", text=f"Frame cache: {cache.hits} reused, {cache.misses} regenerated\n")
 
         return processed, failed, errors
 
@@ -2294,9 +2502,23 @@ def process_input_file(file_path, output_filename='movie.tex', ide_callback=None
         error_msg = f"Error processing file: {str(e)}"
         errors.append(error_msg)
         if ide_callback:
-            ide_callback("error", {'message': error_msg})
+            emit(ide_callback, "error", message=error_msg)
         return processed, failed, errors
 
+def frame_notes(notes):
+    """Speaker notes as written to the frame: comments dropped, URLs formatted"""
+    formatted = []
+    for line in notes:
+        if line.startswith('%'):
+            continue
+        if line.startswith(('http://', 'https://', 'www')):
+            formatted.append('\\begin{itemize}')
+            formatted.append(format_url_note(line))
+            formatted.append('\\end{itemize}')
+        else:
+            formatted.append(line)
+    return formatted
+
 def should_process_frame(title, content, media, notes):
     """
     Determine if a frame should be processed based on its components.
@@ -2307,14 +2529,16 @@ def should_process_frame(title, content, media, notes):
             (content is not None and len(content) > 0) or
             (notes is not None and len(notes) > 0))
 
-def process_frame(outfile, title, content, notes, media):
-    """Process a single frame and write it to the output file"""
+def generate_frame_latex(title, content, notes, media, resolved_media=None, on_event=None):
+    """Generate the LaTeX for a single frame. Returns (latex_code, directive)"""
     # Generate frame content
     latex_code, directive = process_media(
         media if media else "\\None",
-        content if content else [],  # Pass empty list instead of None
+        list(content) if content else [],  # Pass empty list instead of None
         title,
-        False  # playable flag
+        False,  # playable flag
+        resolved_media=resolved_media,
+        on_event=on_event
     )
 
     # Insert notes before \end{frame}
@@ -2324,6 +2548,11 @@ def process_frame(outfile, title, content, notes, media):
             notes_text = '\n'.join(f'    \\note{{{note}}}' for note in notes)
             latex_code = latex_code[:frame_end] + '\n' + notes_text + '\n' + latex_code[frame_end:]
 
+    return latex_code, directive
+
+def process_frame(outfile, title, content, notes, media):
+    """Process a single frame and write it to the output file"""
+    latex_code, _ = generate_frame_latex(title, content, notes, media)
     outfile.write(latex_code + '\n')
 
 #------------------------------------------------------
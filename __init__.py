@@ -5,6 +5,7 @@ A tool for creating Beamer presentations with multimedia support.
 
 import os
 import sys
+import importlib
 import traceback
 
 # Add package directory to path
@@ -12,13 +13,25 @@ package_dir = os.path.dirname(os.path.abspath(__file__))
 if package_dir not in sys.path:
     sys.path.insert(0, package_dir)
 
-try:
-    from .BSG_IDE import BeamerSlideEditor, launch_ide
-    from .BeamerSlideGenerator import *
-except Exception as e:
-    print(f"Error importing modules: {str(e)}")
-    traceback.print_exc()
-    raise
+# The IDE and the converter load on first use, so `bsg build` and other
+# headless entry points never pull in tkinter through the package
+_IDE_NAMES = ('BeamerSlideEditor', 'launch_ide')
+
+
+def __getattr__(name):
+    module_name = '.BSG_IDE' if name in _IDE_NAMES else '.BeamerSlideGenerator'
+    try:
+        module = importlib.import_module(module_name, __name__)
+    except Exception as e:
+        print(f"Error importing modules: {str(e)}")
+        traceback.print_exc()
+        raise
+    try:
+        value = getattr(module, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
 
 __version__ = "2.4.4"
 __author__ = "Ninan Sajeeth Philip"
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+importtime_budget.py
+Import-time budget for BSG-IDE and the converter.
+
+Each module is imported in a fresh interpreter under `python -X importtime`.
+The check fails when the median cumulative import time exceeds the module's
+budget, or when a heavy optional module is loaded eagerly. With --window,
+the time from interpreter start to the first drawn IDE window is measured
+too (needs a display). Modules under bsg_ide are imported through the
+installed package layout (a bsg_ide symlink to the repo), as the `bsg`
+console script does.
+
+    python benchmarks/importtime_budget.py [--runs 5] [--window]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = 'bsg_ide'
+
+# module -> (budget in ms, modules that must not be loaded by importing it)
+BUDGETS = {
+    'BeamerSlideGenerator': (150, ('tkinter', 'customtkinter', 'requests', 'PIL.Image',
+                                   'cv2', 'fitz', 'yt_dlp', 'webbrowser')),
+    'BSG_IDE': (500, ('cv2', 'fitz', 'yt_dlp', 'spellchecker', 'pyautogui',
+                      'screeninfo', 'requests', 'numpy')),
+    # The `bsg` console script: must stay headless
+    f'{PACKAGE}.BSG_build': (150, ('tkinter', 'customtkinter', 'requests', 'PIL.Image',
+                                   'cv2', 'fitz', 'yt_dlp')),
+}
+WINDOW_BUDGET_MS = 1000
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+# The IDE redirects sys.stdout into its terminal, so report on the real stdout
+WINDOW_SCRIPT = """
+import sys
+import BSG_IDE
+app = BSG_IDE.BeamerSlideEditor()
+app.update()
+sys.__stdout__.write("window shown\\n")
+sys.__stdout__.flush()
+app.destroy()
+"""
+
+
+def measure_import(module, cwd=ROOT):
+    """(cumulative import ms of module, set of loaded module names)"""
+    code = f"import {module}, sys, json; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, stdin=subprocess.DEVNULL, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative = None
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and match.group(4) == module and len(match.group(3)) <= 1:
+            cumulative = int(match.group(2)) / 1000
+    loaded = set(json.loads(result.stdout.strip().splitlines()[-1]))
+    return cumulative, loaded
+
+
+def measure_window():
+    """Milliseconds from launching the interpreter to the first drawn IDE window"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", WINDOW_SCRIPT], cwd=ROOT,
+                               stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, text=True)
+    for line in process.stdout:
+        if line.startswith("window shown"):
+            elapsed = (time.perf_counter() - start) * 1000
+            break
+    else:
+        process.wait()
+        raise RuntimeError(f"IDE window failed to open:\n{process.stderr.read()[-2000:]}")
+    process.communicate()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check BSG import-time budgets')
+    parser.add_argument('--runs', type=int, default=5, help='imports per module (median is used)')
+    parser.add_argument('--window', action='store_true', help='also measure time to first IDE window')
+    args = parser.parse_args()
+
+    # Installed layout: a directory holding the repo as the bsg_ide package
+    installed = tempfile.TemporaryDirectory()
+    os.symlink(ROOT, os.path.join(installed.name, PACKAGE), target_is_directory=True)
+
+    failed = False
+    for module, (budget, forbidden) in BUDGETS.items():
+        cwd = installed.name if module.startswith(PACKAGE + '.') else ROOT
+        times = []
+        loaded = set()
+        for _ in range(args.runs):
+            cumulative, loaded = measure_import(module, cwd)
+            times.append(cumulative)
+        median = statistics.median(times)
+        eager = sorted(name for name in forbidden if name in loaded)
+
+        status = "ok" if median <= budget and not eager else "FAIL"
+        print(f"{status:4} {module:22} {median:7.1f} ms (budget {budget} ms)")
+        if eager:
+            print(f"     eagerly imported: {', '.join(eager)}")
+        failed |= status != "ok"
+
+    installed.cleanup()
+
+    if args.window:
+        elapsed = measure_window()
+        status = "ok" if elapsed <= WINDOW_BUDGET_MS else "FAIL"
+        print(f"{status:4} {'first IDE window':22} {elapsed:7.1f} ms (budget {WINDOW_BUDGET_MS} ms)")
+        failed |= status != "ok"
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
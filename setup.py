@@ -19,6 +19,7 @@ setup(
     entry_points={
         'console_scripts': [
             'bsg-ide=bsg_ide.BSG_IDE:main',
+            'bsg=bsg_ide.BSG_build:main',
         ],
     },
     package_data={
@@ -28,6 +29,16 @@ setup(
             '*.png',
             'requirements.txt',
             'BeamerSlideGenerator.py',
+            'BSG_environment.py',
+            'BSG_build.py',
+            'BSG_compiler.py',
+            'BSG_fetch.py',
+            'BSG_lazy.py',
+            'BSG_media_cache.py',
+            'BSG_parser.py',
+            'BSG_spellcheck.py',
+            'BSG_thumbnails.py',
+            'BSG_trace.py',
             'BSG_IDE.py'
         ],
     },
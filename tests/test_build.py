@@ -0,0 +1,28 @@
+import os
+import sys
+import json
+import shutil
+import subprocess
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_bsg_build_converts_demo_deck_offline(tmp_path):
+    deck = tmp_path / 'demo-presentation.txt'
+    shutil.copy(os.path.join(REPO, 'demo-presentation.txt'), deck)
+    env = dict(os.environ, HOME=str(tmp_path), BSG_MEDIA_CACHE_DIR=str(tmp_path / 'media-cache'))
+    env.pop('BSG_TRACE', None)
+
+    run = subprocess.run(
+        [sys.executable, os.path.join(REPO, 'BSG_build.py'), 'build', str(deck),
+         '--no-compile', '--no-network', '--jobs', '1'],
+        stdin=subprocess.DEVNULL, capture_output=True, text=True, env=env, timeout=300)
+
+    assert run.returncode == 0, run.stderr
+    summary = json.loads(run.stdout.strip().splitlines()[-1])
+    assert summary['status'] == 'ok'
+    assert summary['failed'] == 0
+    assert summary['processed'] > 0
+    assert summary['pdfs'] == {}
+    assert os.path.exists(summary['tex'])
+    assert (tmp_path / '.bsg-build' / 'demo-presentation' / 'summary.json').exists()
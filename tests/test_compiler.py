@@ -0,0 +1,115 @@
+import os
+
+import BSG_compiler
+
+
+def fake_pdflatex(outputs):
+    """
+    Stand-in for run_pdflatex_pass. Each call pops (exit code, aux text, write pdf)
+    from outputs and writes the job's .aux/.pdf accordingly.
+    """
+    calls = []
+
+    def run(tex_file, cwd=None, **options):
+        cwd = cwd or os.path.dirname(tex_file)
+        jobname = os.path.splitext(os.path.basename(tex_file))[0]
+        return_code, aux, write_pdf = outputs.pop(0)
+        calls.append(return_code)
+        with open(os.path.join(cwd, jobname + '.aux'), 'w') as f:
+            f.write(aux)
+        if write_pdf:
+            with open(os.path.join(cwd, jobname + '.pdf'), 'w') as f:
+                f.write(f"pdf after pass {len(calls)}")
+        return return_code
+    return run, calls
+
+
+def test_recoverable_error_still_runs_until_aux_is_stable(tmp_path, monkeypatch):
+    tex = tmp_path / "deck.tex"
+    tex.write_text("")
+    # A missing figure exits 1 but ships pages; references settle on pass 2
+    run, calls = fake_pdflatex([(1, "refs-1", True), (1, "refs-2", True), (1, "refs-2", True)])
+    monkeypatch.setattr(BSG_compiler, 'run_pdflatex_pass', run)
+
+    assert BSG_compiler.run_pdflatex_passes(str(tex), str(tmp_path))
+    assert calls == [1, 1, 1]
+
+
+def test_pass_without_fresh_pdf_fails(tmp_path, monkeypatch):
+    tex = tmp_path / "deck.tex"
+    tex.write_text("")
+    (tmp_path / "deck.pdf").write_text("stale")
+    run, calls = fake_pdflatex([(1, "", False)])
+    monkeypatch.setattr(BSG_compiler, 'run_pdflatex_pass', run)
+
+    assert not BSG_compiler.run_pdflatex_passes(str(tex), str(tmp_path))
+    assert calls == [1]
+
+
+def test_build_notes_mode_ignores_stale_pdf_after_fatal_run(tmp_path, monkeypatch):
+    monkeypatch.setenv(BSG_compiler.FORMAT_ENV, '0')
+    deck = tmp_path / "deck.tex"
+    deck.write_text("\\documentclass{beamer}\n\\begin{document}\n\\end{document}\n")
+
+    run, _ = fake_pdflatex([(0, "refs", True), (0, "refs", True)])
+    monkeypatch.setattr(BSG_compiler, 'run_pdflatex_pass', run)
+    assert BSG_compiler.build_notes_mode(str(deck), 'slides')
+
+    # The next run dies before shipping a page; the old PDF must not be reported
+    run, _ = fake_pdflatex([(1, "", False)])
+    monkeypatch.setattr(BSG_compiler, 'run_pdflatex_pass', run)
+    assert BSG_compiler.build_notes_mode(str(deck), 'slides') is None
+
+
+def test_recoverable_error_keeps_aux_files_for_warm_builds(tmp_path, monkeypatch):
+    monkeypatch.setenv(BSG_compiler.FORMAT_ENV, '0')
+    deck = tmp_path / "deck.tex"
+    deck.write_text("\\documentclass{beamer}\n\\begin{document}\n\\end{document}\n")
+
+    run, _ = fake_pdflatex([(1, "refs", True), (1, "refs", True)])
+    monkeypatch.setattr(BSG_compiler, 'run_pdflatex_pass', run)
+    assert BSG_compiler.build_notes_mode(str(deck), 'slides')
+
+    build_dir = os.path.join(BSG_compiler.build_root(str(deck)), 'slides')
+    assert os.path.exists(os.path.join(build_dir, 'deck_slides.aux'))
+
+
+def run_with_format(tmp_path, monkeypatch, outputs, lines):
+    """compile_in_build_dir with a stubbed format and pdflatex; returns (success, pdflatex args)"""
+    monkeypatch.setattr(BSG_compiler, 'ensure_preamble_format', lambda *a, **k: 'preamble-test')
+    job = tmp_path / "job.tex"
+    job.write_text("")
+    args = []
+
+    def run(tex_file, cwd=None, on_line=None, extra_args=(), **options):
+        args.append(tuple(extra_args))
+        return_code, aux, write_pdf = outputs.pop(0)
+        if on_line and extra_args:
+            for line in lines:
+                on_line(line)
+        (tmp_path / "job.aux").write_text(aux)
+        if write_pdf:
+            (tmp_path / "job.pdf").write_text(f"pdf {len(args)}")
+        return return_code
+
+    monkeypatch.setattr(BSG_compiler, 'run_pdflatex_pass', run)
+    success = BSG_compiler.compile_in_build_dir(str(job), str(tmp_path), "")
+    return success, args
+
+
+def test_format_load_error_falls_back_to_source(tmp_path, monkeypatch):
+    success, args = run_with_format(
+        tmp_path, monkeypatch, [(1, "", False), (0, "refs", True), (0, "refs", True)],
+        ["---! preamble-test.fmt was written by pdftex\n"])
+    assert success
+    assert args == [('-fmt=preamble-test',), (), ()]
+    assert (tmp_path / "preamble-test.fmt.failed").exists()
+
+
+def test_document_error_does_not_reject_format(tmp_path, monkeypatch):
+    success, args = run_with_format(
+        tmp_path, monkeypatch, [(1, "", False)],
+        ["! Undefined control sequence.\n"])
+    assert not success
+    assert args == [('-fmt=preamble-test',)]
+    assert not (tmp_path / "preamble-test.fmt.failed").exists()
@@ -0,0 +1,35 @@
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+import BeamerSlideGenerator
+from BeamerSlideGenerator import MediaConverter
+
+
+class BrokenFetcher:
+    """Sends one chunk, then loses the connection"""
+
+    class Response:
+        headers = {'content-type': 'image/png'}
+
+        def raise_for_status(self):
+            pass
+
+    @contextmanager
+    def stream(self, url, headers=None, timeout=None):
+        yield self.Response()
+
+    @staticmethod
+    def iter_body(response, progress=None):
+        yield b'partial'
+        raise ConnectionResetError("connection reset")
+
+
+def test_failed_download_leaves_no_temp_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    monkeypatch.setattr(BeamerSlideGenerator, 'get_fetcher', BrokenFetcher)
+
+    with pytest.raises(ConnectionResetError):
+        MediaConverter().download_to_temp('https://example.com/a.png')
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,26 @@
+import BSG_environment
+
+
+def test_stamp_is_reused_but_stamped_missing_modules_are_rechecked(tmp_path, monkeypatch):
+    monkeypatch.setattr(BSG_environment, 'STAMP_FILE', tmp_path / 'environment.json')
+    requirements = tmp_path / 'requirements.txt'
+    requirements.write_text("json\nbsg-not-a-real-module\n")
+
+    missing = BSG_environment.check_environment(str(requirements))
+    assert missing == [('bsg-not-a-real-module', 'bsg_not_a_real_module')]
+
+    # A stale stamp that still lists an importable module ("installed by hand")
+    BSG_environment.write_stamp(missing=[('json', 'json')] + missing)
+    assert BSG_environment.check_environment(str(requirements)) == missing
+    assert [tuple(item) for item in BSG_environment.read_stamp()['missing']] == missing
+
+
+def test_stamp_key_changes_with_requirements(tmp_path, monkeypatch):
+    monkeypatch.setattr(BSG_environment, 'STAMP_FILE', tmp_path / 'environment.json')
+    requirements = tmp_path / 'requirements.txt'
+    requirements.write_text("json\n")
+    assert BSG_environment.check_environment(str(requirements)) == []
+
+    requirements.write_text("json\nbsg-not-a-real-module\n")
+    assert BSG_environment.check_environment(str(requirements)) == [
+        ('bsg-not-a-real-module', 'bsg_not_a_real_module')]
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from BeamerSlideGenerator import FrameCache
+
+
+@pytest.fixture
+def deck_dir(tmp_path, monkeypatch):
+    # Media paths in decks are relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'media_files').mkdir()
+    (tmp_path / 'media_files' / 'a.png').write_bytes(b'png')
+    return tmp_path
+
+
+def test_key_depends_on_every_frame_field(deck_dir):
+    cache = FrameCache('deck.tex')
+    base = cache.key("Title", ["- a"], ["note"], "\\file media_files/a.png")
+
+    assert cache.key("Title", ["- a"], ["note"], "\\file media_files/a.png") == base
+    assert cache.key("Other", ["- a"], ["note"], "\\file media_files/a.png") != base
+    assert cache.key("Title", ["- b"], ["note"], "\\file media_files/a.png") != base
+    assert cache.key("Title", ["- a"], ["other"], "\\file media_files/a.png") != base
+    assert cache.key("Title", ["- a"], ["note"], "\\None") != base
+
+
+def test_key_changes_when_local_media_changes(deck_dir):
+    cache = FrameCache('deck.tex')
+    media = "\\file media_files/a.png"
+    before = cache.key("Title", [], [], media)
+
+    (deck_dir / 'media_files' / 'a.png').write_bytes(b'a larger png')
+    assert cache.key("Title", [], [], media) != before
+
+
+def test_entries_are_dropped_when_their_media_disappears(deck_dir):
+    cache = FrameCache('deck.tex')
+    key = cache.key("Title", [], [], "\\file media_files/a.png")
+    cache.put(key, "\\includegraphics{media_files/a.png}", "\\file media_files/a.png")
+    assert cache.get(key) is not None
+
+    os.unlink(deck_dir / 'media_files' / 'a.png')
+    assert cache.get(key) is None
+
+
+def test_save_keeps_only_entries_used_by_the_run(deck_dir):
+    cache = FrameCache('deck.tex')
+    used = cache.key("Used", [], [], None)
+    unused = cache.key("Unused", [], [], None)
+    cache.put(used, "used", "\\None")
+    cache.entries[unused] = {'latex': "unused", 'files': []}
+    cache.save()
+
+    reloaded = FrameCache('deck.tex')
+    assert reloaded.get(used) == "used"
+    assert reloaded.get(unused) is None
+    assert (reloaded.hits, reloaded.misses) == (1, 1)
@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+
+import pytest
+
+import BSG_media_cache
+from BSG_media_cache import MediaCache, OfflineCacheMiss
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=b'', headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = dict(headers or {})
+        self.headers.setdefault('content-length', str(len(body)))
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class FakeFetcher:
+    """Serves queued responses and records the request headers"""
+
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+
+    @contextmanager
+    def stream(self, url, headers=None, timeout=None):
+        self.requests.append((url, dict(headers or {})))
+        yield self.responses.pop(0)
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    fake = FakeFetcher()
+    monkeypatch.setattr(BSG_media_cache, 'get_fetcher', lambda: fake)
+    return fake
+
+
+URL = 'https://example.com/a.png'
+
+
+def test_fresh_entries_are_served_without_a_request(tmp_path, fetcher):
+    cache = MediaCache(tmp_path, offline=False)
+    fetcher.responses.append(FakeResponse(body=b'png body', headers={'content-type': 'image/png', 'ETag': '"v1"'}))
+
+    path = cache.fetch(URL)
+    assert open(path, 'rb').read() == b'png body'
+    assert cache.fetch(URL) == path
+    assert len(fetcher.requests) == 1
+
+    # The index survives a restart
+    assert MediaCache(tmp_path, offline=False).lookup(URL)['etag'] == '"v1"'
+
+
+def test_stale_entries_are_revalidated_with_their_validators(tmp_path, fetcher):
+    cache = MediaCache(tmp_path, revalidate_after=0, offline=False)
+    fetcher.responses.append(FakeResponse(body=b'png body', headers={'ETag': '"v1"'}))
+    path = cache.fetch(URL)
+
+    fetcher.responses.append(FakeResponse(status_code=304))
+    assert cache.fetch(URL) == path
+    assert fetcher.requests[-1][1] == {'If-None-Match': '"v1"'}
+
+
+def test_offline_mode_serves_cached_entries_only(tmp_path, fetcher):
+    cache = MediaCache(tmp_path, revalidate_after=0, offline=False)
+    fetcher.responses.append(FakeResponse(body=b'png body'))
+    path = cache.fetch(URL)
+
+    cache.offline = True
+    assert cache.fetch(URL) == path
+    with pytest.raises(OfflineCacheMiss):
+        cache.fetch('https://example.com/never-fetched.png')
+    assert len(fetcher.requests) == 1
+
+
+def test_least_recently_used_bodies_are_evicted(tmp_path, fetcher):
+    cache = MediaCache(tmp_path, max_bytes=15, offline=False)
+    fetcher.responses.append(FakeResponse(body=b'0123456789'))
+    old = cache.fetch('https://example.com/old.bin')
+    fetcher.responses.append(FakeResponse(body=b'abcdefghij'))
+    new = cache.fetch('https://example.com/new.bin')
+
+    assert cache.lookup('https://example.com/old.bin') is None
+    assert cache.lookup('https://example.com/new.bin') is not None
+    assert not tmp_path.joinpath('files', old.rsplit('/', 1)[-1]).exists()
+    assert open(new, 'rb').read() == b'abcdefghij'
+
+
+def test_hits_are_flushed_to_the_index_once(tmp_path, fetcher):
+    cache = MediaCache(tmp_path, offline=False)
+    fetcher.responses.append(FakeResponse(body=b'png body'))
+    cache.fetch(URL)
+    stored = MediaCache(tmp_path).lookup(URL)['last_used']
+
+    cache.fetch(URL)
+    assert cache.dirty
+    assert MediaCache(tmp_path).lookup(URL)['last_used'] == stored
+
+    cache.flush()
+    assert not cache.dirty
+    assert MediaCache(tmp_path).lookup(URL)['last_used'] > stored
@@ -0,0 +1,123 @@
+import io
+import os
+
+import pytest
+
+from BSG_parser import DeckParser, Slide, serialize_deck, write_deck
+
+HEADER = "\\title{Deck}\n\\begin{document}\n"
+
+
+def load(source: bytes):
+    """Parse source bytes the way the IDE's load_file does"""
+    parser = DeckParser(io.StringIO(source.decode('utf-8'), newline=''))
+    slides = [Slide.from_record(record) for record in parser]
+    return parser, slides
+
+
+def test_clean_last_slide_without_trailing_newline_keeps_end_document():
+    source = (HEADER + "\\title One\n\\begin{Content}\n- a\n\\end{Content}\n\n"
+              "\\begin{Notes}\nnote\n\\end{Notes}").encode('utf-8')
+    _, slides = load(source)
+    assert not slides[0].dirty
+
+    data, _ = serialize_deck(HEADER, slides, source)
+    assert b"\\end{Notes}\n\\end{document}" in data
+
+    parser, reloaded = load(data)
+    assert parser.has_end_document
+    assert [(s.title, s.content, s.notes) for s in reloaded] == [("One", ("- a",), ("note",))]
+
+
+def test_write_deck_round_trip_without_trailing_newline(tmp_path):
+    path = tmp_path / "deck.txt"
+    source = (HEADER + "\\title One\n\\begin{Content}\n- a\n\\end{Content}").encode('utf-8')
+    path.write_bytes(source)
+    _, slides = load(source)
+
+    written = write_deck(str(path), HEADER, slides, source)
+    assert path.read_bytes() == written
+
+    parser, reloaded = load(written)
+    assert parser.has_end_document
+    assert reloaded[0].content == ("- a",)
+
+
+
+def test_save_overwrites_external_changes(tmp_path):
+    path = tmp_path / "deck.txt"
+    _, slides = load((HEADER + "\\title One\n\\begin{Content}\n- a\n\\end{Content}\n").encode('utf-8'))
+    source = write_deck(str(path), HEADER, slides)
+
+    # e.g. a git checkout or another editor touched the file after it was loaded
+    path.write_bytes(b"changed elsewhere\n")
+    written = write_deck(str(path), HEADER, slides, source)
+    assert path.read_bytes() == written
+    assert fields(load(written)[1]) == fields(slides)
+
+
+@pytest.mark.skipif(os.name != 'posix', reason="file modes are POSIX only")
+def test_new_deck_follows_umask(tmp_path):
+    path = tmp_path / "new.txt"
+    umask = os.umask(0o022)
+    try:
+        write_deck(str(path), HEADER, [], b'')
+    finally:
+        os.umask(umask)
+    assert path.stat().st_mode & 0o777 == 0o644
+
+
+ROOT_DECK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'LLMsLMMs.txt')
+
+
+def fields(slides):
+    return [(s.title, s.media, s.content, s.notes) for s in slides]
+
+
+def round_trip(source: bytes, dirty: bool = False):
+    """Parse, serialize (clean copies or regenerated text) and parse again"""
+    parser, slides = load(source)
+    header = ''.join(parser.header_lines)
+    if dirty:
+        slides = [slide.copy() for slide in slides]
+    data, spans = serialize_deck(header, slides, source)
+    reparsed, reloaded = load(data)
+    return slides, data, spans, reparsed, reloaded
+
+
+@pytest.mark.parametrize('dirty', [False, True])
+def test_example_deck_round_trips(dirty):
+    with open(ROOT_DECK, 'rb') as f:
+        source = f.read()
+    slides, data, spans, reparsed, reloaded = round_trip(source, dirty)
+
+    assert len(slides) > 10
+    assert reparsed.has_end_document
+    assert fields(reloaded) == fields(slides)
+    # Every span points at the slide's own text in the new file
+    for slide, (start, end) in zip(reloaded, spans):
+        assert data[start:end].startswith(f"\\title {slide.title}".encode('utf-8'))
+
+
+@pytest.mark.parametrize('dirty', [False, True])
+def test_crlf_deck_round_trips(dirty):
+    source = (HEADER + "\\title One\n\\begin{Content} \\file media_files/a.png\n- a\n"
+              "\\end{Content}\n\n\\begin{Notes}\nnote\n\\end{Notes}\n\n"
+              "\\title Two\n\\begin{Content}\n- b\n\\end{Content}\n"
+              "\\end{document}\n").replace("\n", "\r\n").encode('utf-8')
+    slides, _, _, reparsed, reloaded = round_trip(source, dirty)
+
+    assert fields(slides) == [("One", "\\file media_files/a.png", ("- a",), ("note",)),
+                              ("Two", "", ("- b",), ())]
+    assert reparsed.has_end_document
+    assert fields(reloaded) == fields(slides)
+
+
+@pytest.mark.parametrize('dirty', [False, True])
+def test_deck_without_end_document_gains_one(dirty):
+    source = (HEADER + "\\title One\n\\begin{Content}\n- a\n\\end{Content}\n").encode('utf-8')
+    slides, data, _, reparsed, reloaded = round_trip(source, dirty)
+
+    assert data.endswith(b"\\end{document}")
+    assert reparsed.has_end_document
+    assert fields(reloaded) == fields(slides)
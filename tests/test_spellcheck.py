@@ -0,0 +1,20 @@
+import threading
+
+from BSG_spellcheck import SpellCheckEngine
+
+
+def test_engine_is_loaded_only_after_the_loader_finishes():
+    release = threading.Event()
+
+    def loader():
+        release.wait(5)
+        return {'word'}
+
+    engine = SpellCheckEngine(loader=loader)
+    engine.start()
+    assert not engine.loaded
+
+    release.set()
+    engine.submit('editor', [(1, 'word wrod')])
+    assert engine.done.get(timeout=5) == ('editor', {1: ('word wrod', [(5, 9)])})
+    assert engine.loaded
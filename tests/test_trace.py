@@ -0,0 +1,42 @@
+import json
+import threading
+
+import BSG_trace
+
+
+def test_spans_from_many_threads_while_taking_events(tmp_path):
+    BSG_trace.enable()
+    try:
+        stop = threading.Event()
+
+        def work():
+            while not stop.is_set():
+                with BSG_trace.span('slide', index=1, title='t'):
+                    BSG_trace.count('frames_emitted')
+
+        threads = [threading.Thread(target=work, name=f"bsg-test-{i}") for i in range(4)]
+        for thread in threads:
+            thread.start()
+        events = []
+        for _ in range(500):
+            events.extend(BSG_trace.take_events())
+        stop.set()
+        for thread in threads:
+            thread.join()
+        events.extend(BSG_trace.take_events())
+    finally:
+        BSG_trace.disable()
+
+    assert {event['ph'] for event in events} == {'X', 'C', 'M'}
+    trace = BSG_trace.chrome_trace(events)
+    json.loads(json.dumps(trace))
+    assert min(e['ts'] for e in trace['traceEvents'] if 'ts' in e) == 0
+    assert 'slowest slides' in BSG_trace.summary(events)
+
+
+def test_disabled_tracing_records_nothing():
+    BSG_trace.disable()
+    with BSG_trace.span('parse'):
+        BSG_trace.count('bytes_downloaded', 10)
+    assert BSG_trace.span('parse') is BSG_trace.NULL_SPAN
+    assert BSG_trace.take_events() == []